@@ -1,10 +1,23 @@
+import os
 from pathlib import Path
 
 # Base paths
 BASE_DIR = Path(__file__).parent.parent
+HOME_DIR = Path(os.environ.get("INVENGO_HOME") or BASE_DIR)  # Shop data root; replays use a copy
 TEMPLATES_DIR = BASE_DIR / "templates"
 ASSETS_DIR = BASE_DIR / "assets"
+ARCHIVE_DIR = HOME_DIR / "archive"
+DATA_DIR = HOME_DIR / "data"
+INVOICES_DIR = HOME_DIR / "invoices"
+EXPORTS_DIR = HOME_DIR / "exports"
+SESSIONS_DIR = HOME_DIR / "sessions"
+REPLICATION_DIR = DATA_DIR / "replication"
 
 # File paths
 EXCEL_TEMPLATE = TEMPLATES_DIR / "template.xlsx"
-LOGO_IMAGE = ASSETS_DIR / "logo.png"
\ No newline at end of file
+COMBINED_WORKBOOK = HOME_DIR / "templates" / "template.xlsx"  # "Combined Workbook" export
+LOGO_IMAGE = ASSETS_DIR / "Logo.jpg"
+ARCHIVE_MANIFEST = ARCHIVE_DIR / "manifest.json"
+SNAPSHOT_FILE = DATA_DIR / "snapshot.bin"
+CUSTOMER_INDEX = DATA_DIR / "customer_index.bin"
+CUSTOMER_INDEX_LOG = DATA_DIR / "customer_index.log"
\ No newline at end of file
@@ -1,7 +1,19 @@
+import os
+
 class Settings:
     BILL_CODE = "INV"
     WIDTH = 125  # Console width for display
     BILL_FORMATS = ["Compact", "Detailed", "Full"]
     WHATSAPP_FORMATS = ["Simple", "Detailed", "Professional"]
+    ARCHIVE_CACHE_MONTHS = 3  # Archived months kept open for bill lookups
+    NODE_ID = ""  # Shop name for multi-store sync, e.g. "A"; also prefixes bill numbers
+    REPLICATION_PORT = 8765
+    REPLICATION_BIND = ""  # Address "Wait for Sync" listens on, e.g. the shop's LAN IP ("" = all interfaces)
+    REPLICATION_PEERS = ()  # IPs allowed to sync with this shop (empty = any)
+    INVOICE_FONT = "arial.ttf"
+    INVOICE_FONT_BOLD = "arialbd.ttf"
+    INVOICE_WORKERS = None  # Processes for batch invoice rendering (None = one per CPU)
+    PACK_OBJECTIVE = "cheapest"  # Order by weight: "cheapest" or "fewest" packs
+    HEADLESS = bool(os.environ.get("INVENGO_HEADLESS"))  # Session replays: no WhatsApp/browser
     
 settings = Settings()
\ No newline at end of file
@@ -9,9 +9,20 @@ from .inventory import InventoryManager
 from .billing import BillingSystem
 from .customer import CustomerManager
 from .accounts import AccountsManager
+from .receiving import ReceivingManager
+from .replication import ReplicationLog
+from .archive import BillArchive
+from .analytics import CustomerAnalytics
+from .invoice import render_invoice, render_batch
+from .export import export_report, export_in_background
+from .packing import PackOptimizer, parse_weight
+from .storage import SheetStore
+from .snapshot import load_snapshot, save_snapshot
+from .session import SessionRecorder, SessionPlayer, replay_session
 from .utils import (
     format_number,
     image_to_clipboard,
+    read_table,
     open_whatsapp,
     close_browser_tab
 )
@@ -21,8 +32,25 @@ __all__ = [
     'BillingSystem',
     'CustomerManager',
     'AccountsManager',
+    'ReceivingManager',
+    'ReplicationLog',
+    'BillArchive',
+    'CustomerAnalytics',
+    'render_invoice',
+    'render_batch',
+    'export_report',
+    'export_in_background',
+    'PackOptimizer',
+    'parse_weight',
+    'SheetStore',
+    'load_snapshot',
+    'save_snapshot',
+    'SessionRecorder',
+    'SessionPlayer',
+    'replay_session',
     'format_number',
     'image_to_clipboard',
+    'read_table',
     'open_whatsapp',
     'close_browser_tab'
 ]
\ No newline at end of file
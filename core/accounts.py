@@ -1,15 +1,21 @@
+from datetime import datetime
 from openpyxl import load_workbook
 
 class AccountsManager:
-    def __init__(self, workbook):
+    def __init__(self, workbook, replication=None):
         """
         Initialize accounts manager with Excel workbook.
         
         Args:
-            workbook: OpenPyXL Workbook object
+            workbook: SheetStore (or OpenPyXL Workbook) object
+            replication: ReplicationLog recording payments (optional)
         """
         self.workbook = workbook
-        self.sheet = workbook["Accounts"]
+        self.replication = replication
+        
+    @property
+    def sheet(self):
+        return self.workbook["Accounts"]
         
     def get_sales_summary(self):
         """Get total sales summary."""
@@ -34,6 +40,10 @@ class AccountsManager:
             
         self.sheet[f"G{row}"] = amount
         self.sheet[f"H{row}"] = description
+        self.sheet[f"I{row}"] = datetime.now().strftime("%d/%m/%Y")
+        if self.sheet["I2"].value is None:
+            self.sheet["I2"] = "Date"
+        self.workbook.mark_dirty("Accounts")
     
     def update_payment(self, mode, amount, discount=0):
         """
@@ -52,6 +62,12 @@ class AccountsManager:
             self.sheet["B3"] = self.sheet["B3"].value + f"+{amount}"
             if discount:
                 self.sheet["B5"] = self.sheet["B5"].value + f"+{discount}"
+        self.workbook.mark_dirty("Accounts")
+        
+        if self.replication:
+            prefix = "cash" if mode == 1 else "digital"
+            self.replication.record(prefix, amount)
+            self.replication.record(f"{prefix}_discount", discount)
     
     def _eval_cell(self, cell_ref):
         """Evaluate formula cell safely."""
@@ -0,0 +1,231 @@
+import heapq
+import json
+import os
+import pickle
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from config.paths import CUSTOMER_INDEX, CUSTOMER_INDEX_LOG
+
+INDEX_VERSION = 1
+SEGMENTS = [
+    # (name, rule on recency/frequency/monetary scores 1-5), first match wins
+    ("Champions", lambda r, f, m: r >= 4 and f >= 4),
+    ("Loyal", lambda r, f, m: f >= 4),
+    ("New", lambda r, f, m: r >= 4 and f == 1),
+    ("Big Spenders", lambda r, f, m: m >= 4),
+    ("At Risk", lambda r, f, m: r <= 2 and f >= 3),
+    ("Lost", lambda r, f, m: r == 1),
+    ("Regular", lambda r, f, m: True)
+]
+
+
+def bill_item_counts(headers, items):
+    """Quantity per item name from bill rows of any bill format."""
+    name_col, qty_col = headers.index("Item"), headers.index("Qty")
+    counts = Counter()
+    for item in items:
+        counts[item[name_col]] += item[qty_col]
+    return counts
+
+
+def bill_amount(bill):
+    """Amount paid for a parsed bill (after discount)."""
+    totals = dict(bill["totals"])
+    return totals.get("Total", totals.get("Subtotal", 0))
+
+
+def _scores(customers, key):
+    """
+    Quintile score (1-5) of every customer for one metric.
+
+    A value scores by its mid-rank (values below it plus half of the equal
+    ones), so equal values always get the same score: if every customer
+    has the same value, all score 3.
+    """
+    values = sorted(key(phone) for phone in customers)
+    count = len(values)
+    scores = {}
+    for phone in customers:
+        value = key(phone)
+        below = bisect_left(values, value)
+        equal = bisect_right(values, value) - below
+        scores[phone] = 1 + min(4, int(5 * (below + equal / 2) / count))
+    return scores
+
+
+class CustomerAnalytics:
+    def __init__(self, customer_manager, archive, index_path=CUSTOMER_INDEX, log_path=CUSTOMER_INDEX_LOG):
+        """
+        Initialize the per-customer purchase index.
+
+        The index is loaded from index_path plus the bills journalled in
+        log_path since it was written. If it does not cover every bill
+        issued so far it is rebuilt from the Bills sheet and archives.
+
+        Args:
+            customer_manager: CustomerManager instance (for the bill counter)
+            archive: BillArchive instance used to rebuild the index
+            index_path: Pickled index file
+            log_path: Journal of bills recorded since the last save
+        """
+        self.customer_manager = customer_manager
+        self.archive = archive
+        self.index_path = index_path
+        self.log_path = log_path
+        self.customers = {}  # phone -> purchase summary (see _new_customer)
+        self.bill_counter = 0
+
+        self._load()
+        if self.bill_counter != customer_manager.bill_counter:
+            self.rebuild()
+
+    def record_bill(self, bill_number, phone, bill_date, amount, items):
+        """
+        Add a finalized bill to the index and journal it.
+
+        Args:
+            bill_number: Bill number (e.g. INV0001)
+            phone: Customer phone ("" for walk-in bills, which are not indexed)
+            bill_date: datetime of the bill
+            amount: Amount paid after discount
+            items: {item name: quantity}
+        """
+        entry = {
+            "bill": bill_number,
+            "phone": str(phone),
+            "day": bill_date.toordinal(),
+            "amount": amount,
+            "items": dict(items),
+            "counter": self.customer_manager.bill_counter
+        }
+        self._apply(entry)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def rebuild(self):
+        """Rebuild the index from every live and archived bill."""
+        self.customers = {}
+        for bill in self.archive.iter_bills():
+            if bill["phone"] and bill["date"] and bill["headers"]:
+                self._apply({
+                    "bill": bill["number"],
+                    "phone": bill["phone"],
+                    "day": bill["date"].toordinal(),
+                    "amount": bill_amount(bill),
+                    "items": bill_item_counts(bill["headers"], bill["items"])
+                })
+        self.bill_counter = self.customer_manager.bill_counter
+        self.save()
+
+    def save(self):
+        """Write the full index and clear the journal."""
+        temp = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(temp, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "bill_counter": self.bill_counter,
+                "customers": self.customers
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.index_path)
+        if self.log_path.exists():
+            self.log_path.unlink()
+
+    def top_customers(self, n=100, since=None):
+        """
+        Customers with the highest spend.
+
+        Args:
+            n: Number of customers
+            since: Only count bills on or after this date (default: lifetime)
+
+        Returns:
+            list: (phone, amount) pairs, highest first
+        """
+        if since is None:
+            totals = ((phone, c["total"]) for phone, c in self.customers.items())
+        else:
+            start = since.toordinal()
+            totals = (
+                (phone, sum(amount for day, amount, _ in c["bills"] if day >= start))
+                for phone, c in self.customers.items()
+                if c["last"] >= start
+            )
+        return heapq.nlargest(n, totals, key=lambda pair: pair[1])
+
+    def lapsed(self, days=60, today=None):
+        """Customers with no purchase in the last `days` days, longest gone first."""
+        cutoff = (today or date.today()).toordinal() - days
+        gone = [(phone, date.fromordinal(c["last"])) for phone, c in self.customers.items() if c["last"] < cutoff]
+        return sorted(gone, key=lambda pair: pair[1])
+
+    def usual_items(self, phone, n=5):
+        """A customer's most bought items as (name, quantity) pairs."""
+        customer = self.customers.get(str(phone))
+        return customer["items"].most_common(n) if customer else []
+
+    def rfm_segments(self):
+        """
+        Recency/frequency/monetary scores and segment of every customer.
+
+        Returns:
+            dict: phone -> (recency score, frequency score, monetary score, segment)
+        """
+        if not self.customers:
+            return {}
+        customers = self.customers
+        recency = _scores(customers, key=lambda phone: customers[phone]["last"])
+        frequency = _scores(customers, key=lambda phone: customers[phone]["count"])
+        monetary = _scores(customers, key=lambda phone: customers[phone]["total"])
+
+        result = {}
+        for phone in customers:
+            r, f, m = recency[phone], frequency[phone], monetary[phone]
+            segment = next(name for name, rule in SEGMENTS if rule(r, f, m))
+            result[phone] = (r, f, m, segment)
+        return result
+
+    def _apply(self, entry):
+        """Add one bill entry to the in-memory index."""
+        if "counter" in entry:
+            self.bill_counter = entry["counter"]
+        if not entry["phone"]:
+            return
+        customer = self.customers.setdefault(entry["phone"], self._new_customer())
+        customer["bills"].append((entry["day"], entry["amount"], entry["bill"]))
+        customer["items"].update(entry["items"])
+        customer["count"] += 1
+        customer["total"] += entry["amount"]
+        customer["first"] = min(customer["first"], entry["day"])
+        customer["last"] = max(customer["last"], entry["day"])
+
+    def _new_customer(self):
+        return {
+            "bills": [],  # (day ordinal, amount, bill number)
+            "items": Counter(),
+            "count": 0,
+            "total": 0,
+            "first": date.max.toordinal(),
+            "last": 0
+        }
+
+    def _load(self):
+        """Load the saved index and replay the journal."""
+        try:
+            with open(self.index_path, "rb") as f:
+                saved = pickle.load(f)
+            if saved.get("version") == INDEX_VERSION:
+                self.customers = saved["customers"]
+                self.bill_counter = saved["bill_counter"]
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+        if self.log_path.exists():
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Partly written last line
+                    if entry["counter"] > self.bill_counter:
+                        self._apply(entry)
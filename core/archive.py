@@ -0,0 +1,270 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+from openpyxl import Workbook, load_workbook
+from openpyxl.comments import Comment
+from config.paths import ARCHIVE_DIR, ARCHIVE_MANIFEST
+from config.settings import settings
+
+BILL_MARKER = "Bill No: "
+DATE_MARKER = "Date: "
+PHONE_MARKER = "Phone: "
+DATE_FORMAT = "%d/%m/%Y %H:%M"
+
+
+def bill_spans(rows):
+    """Yield (start, stop) row ranges of each bill in a list of row values."""
+    start = None
+    for idx, row in enumerate(rows):
+        first = row[0] if row else None
+        if isinstance(first, str) and first.startswith(BILL_MARKER):
+            if start is not None:
+                yield start, idx
+            start = idx
+    if start is not None:
+        yield start, len(rows)
+
+
+def iter_bill_blocks(rows):
+    """Group Bills sheet row values into one block of rows per bill, streaming."""
+    block = None
+    for row in rows:
+        first = row[0] if row else None
+        if isinstance(first, str) and first.startswith(BILL_MARKER):
+            if block:
+                yield block
+            block = []
+        if block is not None:
+            block.append(row)
+    if block:
+        yield block
+
+
+def parse_bill(block):
+    """Turn a block of bill rows into a dictionary."""
+    bill = {
+        "number": block[0][0][len(BILL_MARKER):].strip(),
+        "date": None,
+        "phone": "",
+        "headers": [],
+        "items": [],
+        "totals": [],
+        "rows": block
+    }
+    for row in block[1:]:
+        first = row[0] if row else None
+        if isinstance(first, str) and first.startswith(DATE_MARKER):
+            bill["date"] = datetime.strptime(first[len(DATE_MARKER):].strip(), DATE_FORMAT)
+        elif isinstance(first, str) and first.startswith(PHONE_MARKER):
+            bill["phone"] = first[len(PHONE_MARKER):].strip()
+        elif first == "S.No.":
+            bill["headers"] = [value for value in row if value is not None]
+        elif isinstance(first, int):
+            bill["items"].append(list(row[:len(bill["headers"])]))
+        elif len(row) > 3 and isinstance(row[2], str) and row[2].endswith(":"):
+            bill["totals"].append((row[2][:-1], row[3]))
+    return bill
+
+
+def month_key(date):
+    """Archive key (YYYY-MM) for a bill date."""
+    return date.strftime("%Y-%m")
+
+
+class BillArchive:
+    def __init__(self, workbook):
+        """
+        Initialize bill archive for the live workbook.
+
+        Args:
+            workbook: SheetStore holding the live Bills sheet
+        """
+        self.workbook = workbook
+        self.manifest = self._load_manifest()
+        self._cache = OrderedDict()  # month -> {bill number: block}
+
+    @property
+    def sheet(self):
+        return self.workbook["Bills"]
+
+    def rotate(self, today=None):
+        """
+        Move bills of closed months from the live sheet to archive files.
+
+        Args:
+            today: Date used to decide which months are closed (default now)
+
+        Returns:
+            dict: Number of archived bills per month
+        """
+        current = month_key(today or datetime.now())
+        if self.manifest.get("rotated") == current:
+            return {}  # Every bill added since the last rotation is from this month
+
+        cells = list(self.sheet.iter_rows())
+        values = [[cell.value for cell in row] for row in cells]
+        keep, archived = [], OrderedDict()
+        for start, stop in bill_spans(values):
+            date = parse_bill(values[start:stop])["date"]
+            month = month_key(date) if date else current
+            block = [self._with_comments(row) for row in cells[start:stop]]
+            if month < current:
+                archived.setdefault(month, []).append(block)
+            else:
+                keep.extend(block)
+
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        for month, blocks in archived.items():
+            self._append_to_archive(month, blocks)
+        if archived:
+            self._rewrite_live_sheet(keep)
+        self.manifest["rotated"] = current
+        self._save_manifest()
+        return {month: len(blocks) for month, blocks in archived.items()}
+
+    def find_bill(self, bill_number):
+        """Find a bill in the live sheet or, failing that, in its archive."""
+        return self.find_bills([bill_number]).get(bill_number)
+
+    def find_bills(self, bill_numbers):
+        """
+        Find several bills, opening each needed archive file only once.
+
+        Args:
+            bill_numbers: Iterable of bill numbers (e.g. INV0001)
+
+        Returns:
+            dict: Parsed bills keyed by bill number (missing bills are left out)
+        """
+        wanted = set(bill_numbers)
+        found = {}
+        for block in iter_bill_blocks(self.sheet.iter_rows(values_only=True)):
+            number = block[0][0][len(BILL_MARKER):].strip()
+            if number in wanted:
+                found[number] = parse_bill(block)
+
+        by_month = {}
+        for number in wanted - found.keys():
+            month = self.manifest["bills"].get(number)
+            if month:
+                by_month.setdefault(month, []).append(number)
+        for month, numbers in by_month.items():
+            blocks = self._load_archive(month)
+            for number in numbers:
+                if number in blocks:
+                    found[number] = parse_bill(blocks[number])
+        return found
+
+    def archive_paths(self, months=None):
+        """Archive files in month order, optionally only the given YYYY-MM keys."""
+        return [
+            ARCHIVE_DIR / self.manifest["months"][month]
+            for month in sorted(self.manifest["months"])
+            if months is None or month in months
+        ]
+
+    def iter_bills(self, months=None):
+        """
+        Yield every bill, archived months first (oldest first), then live ones.
+
+        Archive files are streamed in read-only mode and not cached.
+
+        Args:
+            months: Optional set of YYYY-MM keys to limit the archives read
+        """
+        for path in self.archive_paths(months):
+            archive = load_workbook(path, read_only=True)
+            for block in iter_bill_blocks(archive["Bills"].iter_rows(values_only=True)):
+                yield parse_bill(block)
+            archive.close()
+        for block in iter_bill_blocks(self.sheet.iter_rows(values_only=True)):
+            yield parse_bill(block)
+
+    def bills_between(self, start, end):
+        """Yield bills dated from start to end (dates, inclusive), opening only the archives needed."""
+        months = {
+            month for month in self.manifest["months"]
+            if month_key(start) <= month <= month_key(end)
+        }
+        for bill in self.iter_bills(months):
+            if bill["date"] and start <= bill["date"].date() <= end:
+                yield bill
+
+    def customer_history(self, customer):
+        """Return all bills of a customer (from get_customer) in bill order."""
+        bills = self.find_bills(customer["bills"])
+        return [bills[number] for number in customer["bills"] if number in bills]
+
+    def _with_comments(self, row):
+        """Sheet row as (value, comment text) pairs."""
+        return [(cell.value, cell.comment.text if cell.comment else None) for cell in row]
+
+    def _append_to_archive(self, month, blocks):
+        """Append bill blocks to the archive file of a month."""
+        filename = self.manifest["months"].get(month, f"bills_{month}.xlsx")
+        path = ARCHIVE_DIR / filename
+        if path.exists():
+            archive = load_workbook(path)
+            sheet = archive["Bills"]
+            row_idx = sheet.max_row + 1
+        else:
+            archive = Workbook()
+            sheet = archive.active
+            sheet.title = "Bills"
+            row_idx = 1
+
+        for block in blocks:
+            number = block[0][0][0][len(BILL_MARKER):].strip()
+            if self.manifest["bills"].get(number) == month:
+                continue  # Archived before, but the live sheet was not saved
+            for row in block:
+                self._write_row(sheet, row_idx, row)
+                row_idx += 1
+            self.manifest["bills"][number] = month
+        archive.save(path)
+        self.manifest["months"][month] = filename
+        self._cache.pop(month, None)
+
+    def _rewrite_live_sheet(self, rows):
+        """Replace the live Bills sheet with the rows still in open months."""
+        new = self.workbook.reset_sheet("Bills")
+        for row_idx, row in enumerate(rows, 1):
+            self._write_row(new, row_idx, row)
+
+    def _write_row(self, sheet, row_idx, row):
+        """Write a (value, comment text) row, keeping packaging comments."""
+        for col_idx, (value, comment) in enumerate(row, 1):
+            if value is None and comment is None:
+                continue
+            cell = sheet.cell(row=row_idx, column=col_idx, value=value)
+            if comment:
+                cell.comment = Comment(comment, "InvenGo")
+
+    def _load_archive(self, month):
+        """Load (and cache) the bills of one archive file."""
+        if month in self._cache:
+            self._cache.move_to_end(month)
+            return self._cache[month]
+
+        archive = load_workbook(ARCHIVE_DIR / self.manifest["months"][month], read_only=True)
+        blocks = {}
+        for block in iter_bill_blocks(archive["Bills"].iter_rows(values_only=True)):
+            blocks[block[0][0][len(BILL_MARKER):].strip()] = block
+        archive.close()
+
+        self._cache[month] = blocks
+        if len(self._cache) > settings.ARCHIVE_CACHE_MONTHS:
+            self._cache.popitem(last=False)
+        return blocks
+
+    def _load_manifest(self):
+        """Load the archive manifest (bill number -> month)."""
+        if ARCHIVE_MANIFEST.exists():
+            with open(ARCHIVE_MANIFEST, encoding="utf-8") as f:
+                return json.load(f)
+        return {"months": {}, "bills": {}}
+
+    def _save_manifest(self):
+        """Write the archive manifest."""
+        with open(ARCHIVE_MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
@@ -3,7 +3,10 @@ from datetime import datetime
 from time import sleep
 from tabulate import tabulate
 from openpyxl.comments import Comment
+from config.paths import LOGO_IMAGE
 from config.settings import settings
+from core.analytics import bill_item_counts
+from core.packing import PackOptimizer, parse_weight
 from core.utils import (
     format_number,
     image_to_clipboard,
@@ -13,27 +16,42 @@ from core.utils import (
 from pyautogui import hotkey, press
 
 class BillingSystem:
-    def __init__(self, workbook, inventory, customer_manager):
+    def __init__(self, workbook, inventory, customer_manager, analytics=None, replication=None):
         """
         Initialize billing system with dependencies.
         
         Args:
-            workbook: OpenPyXL Workbook object
+            workbook: SheetStore object
             inventory: InventoryManager instance
             customer_manager: CustomerManager instance
+            analytics: CustomerAnalytics instance to keep updated (optional)
+            replication: ReplicationLog recording payments (optional)
         """
         self.workbook = workbook
         self.inventory = inventory
         self.customers = customer_manager
-        self.bills_sheet = workbook["Bills"]
-        self.sales_sheet = workbook["Sales & Stocks"]
-        self.accounts_sheet = workbook["Accounts"]
+        self.analytics = analytics
+        self.replication = replication
+        self.packer = PackOptimizer(inventory)
         
         # Default formats
         self.bill_format = settings.BILL_FORMATS[0]
         self.whatsapp_format = settings.WHATSAPP_FORMATS[0]
         self.include_full_details = False
 
+    @property
+    def bills_sheet(self):
+        # Looked up on use: archive rotation replaces the Bills sheet
+        return self.workbook["Bills"]
+
+    @property
+    def sales_sheet(self):
+        return self.workbook["Sales & Stocks"]
+
+    @property
+    def accounts_sheet(self):
+        return self.workbook["Accounts"]
+
     def set_formats(self, bill_fmt, whatsapp_fmt, full_details=False):
         """
         Set display formats for bills.
@@ -62,12 +80,23 @@ class BillingSystem:
         packaging_details = {}
         sno = 1
         
-        print("\nEnter items (type 'STOP' or '0' when done):")
+        print("\nEnter items (type 'STOP' or '0' when done, BASE@WEIGHT e.g. ALM@1.5KG to order by weight):")
         while True:
             code = self._get_valid_code()
             if code in ["STOP", "0", ""]:
                 break
                 
+            if "@" in code:
+                for pack_code, quantity in self._weight_order(code):
+                    item_data = self._process_item(
+                        pack_code, quantity, sno,
+                        bill_items, total_weight, packaging_details
+                    )
+                    if item_data:
+                        bill_items.append(item_data)
+                        sno += 1
+                continue
+                
             quantity = self._get_quantity()
             if quantity == 0:
                 continue
@@ -91,6 +120,67 @@ class BillingSystem:
             "phone": phone
         }
 
+    def make_bill_scanner(self, phone=""):
+        """
+        Create a new bill from barcode scans.
+        
+        Each scan adds one unit; repeated scans of a code are merged into one
+        line. Scanning '-' followed by a code removes one unit. Stock checks
+        and sheet writes happen once per line when the bill is closed.
+        
+        Args:
+            phone: Customer phone number (optional)
+            
+        Returns:
+            dict: Bill data including items, total, and packaging details
+        """
+        stock = self.inventory.stock
+        scanned = {}  # Code -> quantity, in first-scan order
+        
+        print("\nScan items (empty scan, 'STOP' or '0' when done, '-CODE' removes one):")
+        while True:
+            code = input("Scan: ").upper().strip()
+            if code in ["STOP", "0", ""]:
+                break
+                
+            remove = code.startswith("-")
+            code = code.lstrip("-")
+            item = stock.get(code)
+            if item is None:
+                print(f"\aUnknown code {code}!")
+                continue
+                
+            if remove:
+                if scanned.get(code):
+                    scanned[code] -= 1
+                    if not scanned[code]:
+                        del scanned[code]
+            else:
+                scanned[code] = scanned.get(code, 0) + 1
+            print(f"  {item[0]} {item[1]}GM x {scanned.get(code, 0)}")
+        
+        bill_items = []
+        total_weight = {}
+        packaging_details = {}
+        for code, quantity in scanned.items():
+            item_data = self._process_item(
+                code, quantity, len(bill_items) + 1,
+                bill_items, total_weight, packaging_details
+            )
+            if item_data:
+                bill_items.append(item_data)
+        
+        if not bill_items:
+            return None
+            
+        total, final_bill = self._calculate_total(bill_items, total_weight)
+        return {
+            "items": final_bill,
+            "total": total,
+            "packaging": packaging_details,
+            "phone": phone
+        }
+
     def display_bill(self, bill_data):
         """Display the bill in console based on selected format."""
         headers = self._get_headers()
@@ -124,12 +214,22 @@ class BillingSystem:
             )
         
         self._update_accounts(payment_mode, bill_data["total"], discount)
+        self.workbook.save()  # Writes only the sheets this bill touched
+        
+        if self.analytics:
+            self.analytics.record_bill(
+                bill_number,
+                bill_data["phone"],
+                bill_data["date"],
+                bill_data["total"] - discount,
+                bill_item_counts(self._get_headers(), self._format_bill_data(bill_data["items"]))
+            )
         return bill_number
 
     def send_whatsapp_bill(self, bill_data, bill_number, discount=0):
         """Send formatted bill via WhatsApp."""
         message = self._prepare_whatsapp_message(bill_data, bill_number, discount)
-        image_to_clipboard(settings.LOGO_IMAGE)
+        image_to_clipboard(LOGO_IMAGE)
         open_whatsapp(bill_data["phone"])
         
         # Paste image and message
@@ -149,8 +249,38 @@ class BillingSystem:
                 return code
             if code in self.inventory.keys:
                 return code
+            base, _, weight = code.partition("@")
+            if weight and base in self.inventory.bases and parse_weight(weight):
+                return code
             print("Invalid code! Try again.")
 
+    def _weight_order(self, order):
+        """
+        Packs for a BASE@WEIGHT entry, confirmed by the cashier.
+        
+        Returns:
+            list: (code, quantity) pairs to bill (empty if declined or out of stock)
+        """
+        base, _, weight = order.partition("@")
+        grams = parse_weight(weight)
+        result = self.packer.solve(base, grams, settings.PACK_OBJECTIVE)
+        if not result:
+            print(f"Not enough stock of {base} for {grams}GM!")
+            return []
+        
+        for code, quantity in result["packs"]:
+            item = self.inventory.stock[code]
+            print(f"  {code} {item[0]} {item[1]}GM x {quantity}")
+        note = "" if result["exact"] else f" (nearest to {grams}GM)"
+        print(f"  Total {result['weight']}GM{note} for ₹{result['price']}")
+        while True:
+            choice = input("Add these packs? (y/n): ").lower()
+            if choice == 'y':
+                return result["packs"]
+            elif choice == 'n':
+                return []
+            print("Invalid choice!")
+
     def _get_quantity(self):
         """Get valid quantity from user."""
         while True:
@@ -184,8 +314,7 @@ class BillingSystem:
         total_weight[item_name] += size * quantity
         
         # Update sales in Excel
-        sale_cell = self._get_sale_cell(code)
-        self.sales_sheet[sale_cell] = self.sales_sheet[sale_cell].value + f"+{quantity}"
+        self.inventory.record_sale(code, quantity)
         
         # Return item data based on bill format
         if self.bill_format == "Compact":
@@ -210,13 +339,6 @@ class BillingSystem:
                 return False
             print("Invalid choice!")
 
-    def _get_sale_cell(self, code):
-        """Get cell address for sales column."""
-        for row in range(2, self.sales_sheet.max_row + 1):
-            if self.sales_sheet[f"C{row}"].value == code:
-                return f"J{row}"
-        raise ValueError(f"Item code {code} not found in sales sheet")
-
     def _calculate_total(self, bill_items, total_weight):
         """Calculate bill total and format final bill."""
         total = sum(item[-1] for item in bill_items if isinstance(item[0], int))
@@ -246,11 +368,13 @@ class BillingSystem:
 
     def _save_to_excel(self, bill_data, payment_mode, discount):
         """Save bill data to Excel."""
-        bill_number = f"{settings.BILL_CODE}{self.customers.increment_bill_counter()}"
+        bill_number = f"{settings.BILL_CODE}{settings.NODE_ID}{self.customers.increment_bill_counter()}"
+        first_row = self.bills_sheet.max_row + 1
+        bill_data["date"] = datetime.now()
         
         # Add bill header
         self.bills_sheet.append([f"Bill No: {bill_number}"])
-        self.bills_sheet.append([f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}"])
+        self.bills_sheet.append([f"Date: {bill_data['date'].strftime('%d/%m/%Y %H:%M')}"])
         if bill_data["phone"]:
             self.bills_sheet.append([f"Phone: {bill_data['phone']}"])
         
@@ -275,14 +399,13 @@ class BillingSystem:
         self.bills_sheet.append(["", "", "Payment Mode:", payment_text])
         
         # Save packaging details as comments
-        self._add_packaging_comments(bill_data["packaging"])
-        
-        self.workbook.save(settings.EXCEL_FILE)
+        self._add_packaging_comments(bill_data["packaging"], first_row)
+        self.workbook.mark_dirty("Bills")
         return bill_number
 
-    def _add_packaging_comments(self, packaging_details):
-        """Add packaging details as Excel comments."""
-        for row in range(1, self.bills_sheet.max_row + 1):
+    def _add_packaging_comments(self, packaging_details, first_row=1):
+        """Add packaging details as Excel comments to the rows of a bill."""
+        for row in range(first_row, self.bills_sheet.max_row + 1):
             item_name = self.bills_sheet[f"B{row}"].value
             if item_name in packaging_details:
                 comment = Comment("\n".join(packaging_details[item_name]), "InvenGo")
@@ -298,7 +421,12 @@ class BillingSystem:
             self.accounts_sheet["B3"] = self.accounts_sheet["B3"].value + f"+{amount}"
             if discount:
                 self.accounts_sheet["B5"] = self.accounts_sheet["B5"].value + f"+{discount}"
-        self.workbook.save(settings.EXCEL_FILE)
+        self.workbook.mark_dirty("Accounts")
+        
+        if self.replication:
+            prefix = "cash" if mode == 1 else "digital"
+            self.replication.record(prefix, amount)
+            self.replication.record(f"{prefix}_discount", discount)
 
     def _prepare_whatsapp_message(self, bill_data, bill_number, discount):
         """Format WhatsApp message based on selected style."""
@@ -1,25 +1,45 @@
+from core.utils import format_number
+
 class CustomerManager:
-    def __init__(self, workbook):
+    def __init__(self, workbook, snapshot=None):
         self.workbook = workbook
-        self.sheet = workbook["Customer Data"]
-        self.bill_counter = self._get_bill_counter()
+        if snapshot:
+            self.bill_counter, self.rows, self.next_row = snapshot
+        else:
+            self.bill_counter = self._get_bill_counter()
+            self.rows, self.next_row = self._build_index()
+    
+    @property
+    def sheet(self):
+        return self.workbook["Customer Data"]
+    
+    def snapshot(self):
+        """Processed state for the startup snapshot"""
+        return self.bill_counter, self.rows, self.next_row
         
     def _get_bill_counter(self):
         """Get current bill counter value"""
         return int(eval(self.sheet["I1"].value[1:]))
     
-    def get_customer(self, phone):
-        """Find customer by phone number"""
+    def _build_index(self):
+        """Map phone numbers to rows and find the first empty row"""
+        rows = {}
         row = 3
         while self.sheet[f"A{row}"].value is not None:
-            if str(self.sheet[f"A{row}"].value) == str(phone):
-                return {
-                    "row": row,
-                    "total": eval(self.sheet[f"B{row}"].value[1:]),
-                    "bills": self.sheet[f"C{row}"].value.split() if self.sheet[f"C{row}"].value else []
-                }
+            rows[str(self.sheet[f"A{row}"].value)] = row
             row += 1
-        return None
+        return rows, row
+    
+    def get_customer(self, phone):
+        """Find customer by phone number"""
+        row = self.rows.get(str(phone))
+        if row is None:
+            return None
+        return {
+            "row": row,
+            "total": eval(self.sheet[f"B{row}"].value[1:]),
+            "bills": self.sheet[f"C{row}"].value.split() if self.sheet[f"C{row}"].value else []
+        }
     
     def update_customer(self, phone, amount, bill_number):
         """Update customer record with new purchase"""
@@ -31,15 +51,17 @@ class CustomerManager:
             self.sheet[f"C{customer['row']}"] = " ".join(bills)
         else:
             # Add new customer
-            row = 3
-            while self.sheet[f"A{row}"].value is not None:
-                row += 1
+            row = self.next_row
             self.sheet[f"A{row}"] = phone
+            self.rows[str(phone)] = row
+            self.next_row += 1
             self.sheet[f"B{row}"] = f"={amount}"
             self.sheet[f"C{row}"] = bill_number
+        self.workbook.mark_dirty("Customer Data")
     
     def increment_bill_counter(self):
         """Increment and return next bill number"""
         self.bill_counter += 1
         self.sheet["I1"] = f"={self.bill_counter}"
+        self.workbook.mark_dirty("Customer Data")
         return format_number(self.bill_counter, 4)
\ No newline at end of file
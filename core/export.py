@@ -0,0 +1,231 @@
+import csv
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from openpyxl import Workbook, load_workbook
+from core.archive import iter_bill_blocks, parse_bill
+
+# Reports read the saved sheet files in read-only mode, never the workbook
+# objects the counter is editing, and write through write-only/CSV writers,
+# so memory stays flat however many rows are exported.
+
+REPORT_HEADERS = {
+    "stock": ["Code", "Name", "Category", "Size", "Unit", "MRP", "Price", "Stock", "Sale", "Balance"],
+    "bills": ["Bill No", "Date", "Phone", "Item", "Size", "Rate", "Qty", "Amount"],
+    "customers": ["Phone", "Total Amount", "Bills", "Bill Numbers"],
+    "expenses": ["Date", "Amount", "Description"]
+}
+REPORT_SHEETS = {
+    "stock": ["Sales & Stocks"],
+    "bills": ["Sales & Stocks", "Bills"],
+    "customers": ["Customer Data"],
+    "expenses": ["Accounts"]
+}
+
+
+class _SheetCopies:
+    """Private copies of saved sheet files, read in place of the store's own."""
+
+    def __init__(self, store, names, folder):
+        self._paths = {}
+        for name in names:
+            self._paths[name] = folder / store.path(name).name
+            if not self._paths[name].exists():  # Linked sheets share a file
+                shutil.copy2(store.path(name), self._paths[name])
+
+    def path(self, name):
+        return self._paths[name]
+
+
+def _eval(value):
+    """Value of an =a+b+c counter formula."""
+    if isinstance(value, str) and value.startswith("="):
+        try:
+            return eval(value[1:])
+        except Exception:
+            return 0
+    return value or 0
+
+
+def _read_rows(path, name, min_row=1):
+    """Stream row values of a sheet in a store or archive file."""
+    workbook = load_workbook(path, read_only=True)
+    try:
+        yield from workbook[name].iter_rows(min_row=min_row, values_only=True)
+    finally:
+        workbook.close()
+
+
+def stock_rows(store, category=None):
+    """Stock report rows, optionally for one category."""
+    for row in _read_rows(store.path("Sales & Stocks"), "Sales & Stocks", min_row=2):
+        if row[2] is None or (category and row[1] != category):
+            continue
+        stock, sale = _eval(row[8]), _eval(row[9])
+        yield [row[2], row[3], row[1], row[4], row[5], row[6], row[7], stock, sale, stock - sale]
+
+
+def bill_rows(store, archive, start=None, end=None, phone=None, category=None):
+    """
+    One row per billed item from the archives and the live Bills file.
+
+    Args:
+        store: SheetStore (its saved Bills file is read)
+        archive: BillArchive (to find archive files)
+        start, end: Optional date range (inclusive)
+        phone: Only bills of this customer
+        category: Only items of this category
+    """
+    names = None
+    if category:
+        names = {row[1] for row in stock_rows(store, category)}
+
+    months = None
+    if start or end:
+        low = start.strftime("%Y-%m") if start else ""
+        high = end.strftime("%Y-%m") if end else "9999-99"
+        months = {month for month in archive.manifest["months"] if low <= month <= high}
+
+    for path in archive.archive_paths(months) + [store.path("Bills")]:
+        for block in iter_bill_blocks(_read_rows(path, "Bills")):
+            bill = parse_bill(block)
+            day = bill["date"].date() if bill["date"] else None
+            if (start and (not day or day < start)) or (end and (not day or day > end)):
+                continue
+            if phone and bill["phone"] != str(phone):
+                continue
+            columns = {name: idx for idx, name in enumerate(bill["headers"])}
+            for item in bill["items"]:
+                if names is not None and item[columns["Item"]] not in names:
+                    continue
+                yield [
+                    bill["number"],
+                    bill["date"].strftime("%d/%m/%Y %H:%M") if bill["date"] else "",
+                    bill["phone"]
+                ] + [item[columns[name]] if name in columns else "" for name in ("Item", "Size", "Rate", "Qty", "Amount")]
+
+
+def customer_rows(store, phone=None):
+    """Customer report rows, optionally for one phone number."""
+    for row in _read_rows(store.path("Customer Data"), "Customer Data", min_row=3):
+        if row[0] is None or (phone and str(row[0]) != str(phone)):
+            continue
+        bills = str(row[2]).split() if row[2] else []
+        yield [row[0], _eval(row[1]), len(bills), " ".join(bills)]
+
+
+def expense_rows(store, start=None, end=None):
+    """Expense rows; a date range skips expenses recorded without a date."""
+    for row in _read_rows(store.path("Accounts"), "Accounts", min_row=4):
+        amount, description = row[6] if len(row) > 6 else None, row[7] if len(row) > 7 else None
+        if amount is None:
+            continue
+        date = row[8] if len(row) > 8 else None
+        if start or end:
+            try:
+                day = datetime.strptime(str(date), "%d/%m/%Y").date()
+            except ValueError:
+                continue
+            if (start and day < start) or (end and day > end):
+                continue
+        yield [date or "", amount, description]
+
+
+def write_rows(path, headers, rows):
+    """
+    Stream rows into a CSV or write-only xlsx file.
+
+    Returns:
+        int: Number of data rows written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    if path.suffix.lower() == ".csv":
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    else:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+            count += 1
+        workbook.save(path)
+    return count
+
+
+def export_report(kind, path, store, archive=None, **filters):
+    """
+    Export one report (stock, bills, customers or expenses).
+
+    Args:
+        kind: Report name (see REPORT_HEADERS)
+        path: Output .xlsx or .csv file
+        store: SheetStore whose saved files are read
+        archive: BillArchive (bills report only)
+        filters: Report filters (category, start, end, phone)
+
+    Returns:
+        int: Number of rows exported
+    """
+    if kind == "stock":
+        rows = stock_rows(store, filters.get("category"))
+    elif kind == "bills":
+        rows = bill_rows(store, archive, filters.get("start"), filters.get("end"),
+                         filters.get("phone"), filters.get("category"))
+    elif kind == "customers":
+        rows = customer_rows(store, filters.get("phone"))
+    elif kind == "expenses":
+        rows = expense_rows(store, filters.get("start"), filters.get("end"))
+    else:
+        raise ValueError(f"Unknown report: {kind}")
+    return write_rows(path, REPORT_HEADERS[kind], rows)
+
+
+def export_in_background(kind, path, store, archive=None, on_done=None, **filters):
+    """
+    Run export_report on a background thread so billing can continue.
+
+    Save the store first: only data already written to the sheet files
+    is exported. The sheet files are copied before the thread starts and
+    the export reads the copies, so the store can keep replacing its files
+    (a reader holding them open blocks that on Windows). Archive files are
+    read in place; they are only written by rotation at startup.
+
+    Args:
+        on_done: Called with (row count, error or None) when finished
+
+    Returns:
+        Thread: The started export thread
+    """
+    if kind not in REPORT_SHEETS:
+        raise ValueError(f"Unknown report: {kind}")
+    folder = Path(tempfile.mkdtemp(prefix="invengo-export-"))
+    try:
+        copies = _SheetCopies(store, REPORT_SHEETS[kind], folder)
+    except OSError:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+
+    def run():
+        try:
+            count = export_report(kind, path, copies, archive, **filters)
+        except Exception as e:
+            if on_done:
+                on_done(0, e)
+            return
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        if on_done:
+            on_done(count, None)
+
+    thread = threading.Thread(target=run, name=f"export-{kind}", daemon=False)
+    thread.start()
+    return thread
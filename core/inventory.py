@@ -1,15 +1,46 @@
+import math
 from openpyxl import load_workbook
 from tabulate import tabulate
 from config.paths import EXCEL_TEMPLATE
 from config.settings import settings
 from core.utils import format_number
 
+# Catalog file column names accepted by upsert_items
+ITEM_COLUMNS = {
+    "base_code": ("base code", "base"),
+    "category": ("category",),
+    "code": ("item code", "code"),
+    "name": ("item name", "name"),
+    "size": ("size", "size (in gm)"),
+    "unit": ("unit",),
+    "mrp": ("mrp",),
+    "price": ("price", "selling price"),
+    "stock": ("stock", "initial stock")
+}
+
 class InventoryManager:
-    def __init__(self, workbook):
+    def __init__(self, workbook, snapshot=None, replication=None):
         self.workbook = workbook
-        self.sheet = workbook["Sales & Stocks"]
-        self.data = self._load_data()
-        self.stock, self.keys, self.categories, self.sizes = self._process_data()
+        self.replication = replication
+        if snapshot:
+            self.data, self.stock, self.categories, self.sizes = snapshot
+            self.keys = self.stock.keys()
+        else:
+            self.data = self._load_data()
+            self.stock, self.keys, self.categories, self.sizes = self._process_data()
+        self.rows = {item[2]: i for i, item in enumerate(self.data)}  # Code -> data index
+        self.bases = {}  # Base code -> item codes
+        for item in self.data:
+            self.bases.setdefault(item[0], []).append(item[2])
+        self.revisions = {}  # Base code -> change count, for caches of stock/price data
+
+    @property
+    def sheet(self):
+        return self.workbook["Sales & Stocks"]
+
+    def snapshot(self):
+        """Processed state for the startup snapshot"""
+        return self.data, self.stock, self.categories, self.sizes
         
     def _load_data(self):
         """Load and process inventory data from Excel"""
@@ -32,23 +63,27 @@ class InventoryManager:
         sizes = {}
         
         for item in self.data:
-            code = item[2]
-            stock[code] = item[3:] + item[:1]  # All details + base code
-            
-            # Categorize
-            category = item[1]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(item[2:])
-            
-            # Size mapping
-            size = item[3]
-            if size not in sizes:
-                sizes[size] = [item[0], item[4]]  # Base code and MRP
-            sizes[size].append(item[4])
+            self._index_item(item, stock, categories, sizes)
             
         return stock, stock.keys(), categories, sizes
     
+    def _index_item(self, item, stock, categories, sizes):
+        """Add one item row to the lookup dictionaries"""
+        code = item[2]
+        stock[code] = item[3:] + item[:1]  # All details + base code
+        
+        # Categorize
+        category = item[1]
+        if category not in categories:
+            categories[category] = []
+        categories[category].append(item[2:])
+        
+        # Size mapping
+        size = item[3]
+        if size not in sizes:
+            sizes[size] = [item[0], item[4]]  # Base code and MRP
+        sizes[size].append(item[4])
+    
     def show_stock(self, category=None, code=None):
         """Display stock in table format"""
         headers = ["Code", "Name", "Size", "Unit", "MRP", "Price", "Stock", "Sale", "Balance"]
@@ -67,17 +102,198 @@ class InventoryManager:
             print("Invalid item code!")
             return False
             
-        stock_col = self._get_column_address("I")  # Stock column
-        address = stock_col.get(code)
-        current = self.sheet[address].value
-        self.sheet[address] = current + f"+{quantity}"
+        self._append_to_cell("I", code, quantity)  # Stock column
+        self._apply_delta(code, stock=quantity)
         return True
     
+    def add_stock_bulk(self, quantities):
+        """Increase stock for many items in one pass ({code: quantity})"""
+        invalid = [code for code in quantities if code not in self.keys]
+        if invalid:
+            print(f"Invalid item code(s): {', '.join(invalid)}")
+            return False
+            
+        for code, quantity in quantities.items():
+            self._append_to_cell("I", code, quantity)
+            self._apply_delta(code, stock=quantity)
+        return True
+    
+    def record_sale(self, code, quantity):
+        """Add sold quantity to an item's sale count"""
+        self._append_to_cell("J", code, quantity)  # Sale column
+        self._apply_delta(code, sale=quantity)
+    
     def add_item(self, details):
-        """Add new item to inventory"""
-        # Implementation omitted for brevity
-        pass
+        """
+        Add new item to inventory
+        
+        Args:
+            details: dict with base_code, category, code, name, size, mrp,
+                price and optionally unit (default GM) and stock (default 0)
+        """
+        code = details["code"]
+        if code in self.keys:
+            print("Item code already exists!")
+            return False
+        error = self._check_numbers(details)
+        if error:
+            print(f"Invalid item: {error}")
+            return False
+            
+        row = len(self.data) + 2
+        stock = details.get("stock", 0)
+        item = [
+            details["base_code"], details["category"], code, details["name"],
+            details["size"], details.get("unit", "GM"), details["mrp"], details["price"],
+            stock, 0, stock
+        ]
+        for col, value in zip("ABCDEFGH", item):
+            self.sheet[f"{col}{row}"] = value
+        self.sheet[f"I{row}"] = f"={stock}"
+        self.sheet[f"J{row}"] = "=0"
+        self.sheet[f"K{row}"] = f"=I{row}-J{row}"
+        self.sheet[f"L{row}"] = f"=J{row}*H{row}"  # Amount, summed by Accounts
+        self.workbook.mark_dirty("Sales & Stocks")
+        
+        self.rows[code] = len(self.data)
+        self.data.append(item)
+        self._index_item(item, self.stock, self.categories, self.sizes)
+        self.bases.setdefault(item[0], []).append(code)
+        self._touch(item[0])
+        if self.replication:
+            self.replication.record(f"stock:{code}", stock)
+        return True
+    
+    def update_price(self, code, mrp=None, price=None):
+        """Change MRP and/or selling price of an existing item"""
+        if code not in self.keys:
+            print("Invalid item code!")
+            return False
+            
+        item = self.data[self.rows[code]]
+        for col, idx, value in (("G", 6, mrp), ("H", 7, price)):
+            if value is None:
+                continue
+            self.sheet[f"{col}{self.rows[code] + 2}"] = value
+            item[idx] = value
+        self.workbook.mark_dirty("Sales & Stocks")
+        
+        self.stock[code][3:5] = item[6:8]
+        for row in self.categories[item[1]]:
+            if row[0] == code:
+                row[4:6] = item[6:8]
+                break
+        self._touch(item[0])
+        return True
+    
+    def upsert_items(self, rows):
+        """
+        Add new items and update prices of existing ones in one pass
+        
+        Args:
+            rows: Row dicts keyed by column name (see ITEM_COLUMNS), e.g. from read_table
+            
+        Returns:
+            tuple: (added count, updated count, [error messages]); nothing is
+            changed when there are errors
+        """
+        new_items, updates, errors = [], [], []
+        seen = set()
+        for line_no, row in enumerate(rows, 2):
+            details, error = self._parse_item_row(row)
+            if not error and details["code"] in seen:
+                error = f"duplicate item code {details['code']}"
+            if error:
+                errors.append(f"Line {line_no}: {error}")
+                continue
+                
+            seen.add(details["code"])
+            if details["code"] in self.keys:
+                updates.append(details)
+            else:
+                missing = [
+                    key for key in ("base_code", "category", "name", "size", "mrp", "price")
+                    if details.get(key) is None
+                ]
+                if missing:
+                    errors.append(f"Line {line_no}: new item {details['code']} needs {', '.join(missing)}")
+                else:
+                    new_items.append(details)
+                    
+        if errors:
+            return 0, 0, errors
+            
+        for details in new_items:
+            self.add_item(details)
+        for details in updates:
+            self.update_price(details["code"], details.get("mrp"), details.get("price"))
+        return len(new_items), len(updates), []
+    
+    def _parse_item_row(self, row):
+        """Read and convert one catalog row, returning (details, error)"""
+        details = {}
+        for key, names in ITEM_COLUMNS.items():
+            for name in names:
+                if row.get(name) not in (None, ""):
+                    details[key] = row[name]
+                    break
+                    
+        if not details.get("code"):
+            return None, "missing item code"
+        details["code"] = str(details["code"]).upper().strip()
+        for key, convert in (("base_code", str.upper), ("category", str.title),
+                             ("name", str), ("unit", str.upper)):
+            if key in details:
+                details[key] = convert(str(details[key]).strip())
+        try:
+            for key in ("size", "stock", "mrp", "price"):
+                if key in details:
+                    details[key] = float(details[key])
+        except ValueError:
+            return None, f"invalid number for {details['code']}"
+        error = self._check_numbers(details)
+        if error:
+            return None, f"{error} for {details['code']}"
+        for key in ("size", "stock"):
+            if key in details:
+                details[key] = int(details[key])
+        return details, None
+    
+    def _check_numbers(self, details):
+        """Error message for an out-of-range size, stock, MRP or price (None if valid)"""
+        for key, minimum in (("size", 1), ("stock", 0)):
+            value = details.get(key)
+            if value is not None and (not math.isfinite(value) or value != int(value) or value < minimum):
+                return f"{key} must be a whole number of at least {minimum}"
+        for key, label in (("mrp", "MRP"), ("price", "price")):
+            value = details.get(key)
+            if value is not None and (not math.isfinite(value) or value <= 0):
+                return f"{label} must be a positive number"
+        return None
+    
+    def _append_to_cell(self, column_char, code, quantity):
+        """Append an increment to an item's Stock/Sale formula"""
+        address = f"{column_char}{self.rows[code] + 2}"
+        self.sheet[address] = self.sheet[address].value + f"+{quantity}"
+        self.workbook.mark_dirty("Sales & Stocks")
+    
+    def _apply_delta(self, code, stock=0, sale=0):
+        """Keep in-memory stock, sale and balance in step with the sheet"""
+        if self.replication:
+            self.replication.record(f"stock:{code}", stock)
+            self.replication.record(f"sale:{code}", sale)
+            
+        item = self.data[self.rows[code]]
+        item[8] += stock
+        item[9] += sale
+        item[10] = item[8] - item[9]
+        self.stock[code][5:8] = item[8:11]
+        for row in self.categories[item[1]]:
+            if row[0] == code:
+                row[6:9] = item[8:11]
+                break
+        self._touch(item[0])
     
-    def _get_column_address(self, column_char):
-        """Map item codes to column addresses"""
-        return {item[2]: f"{column_char}{i+2}" for i, item in enumerate(self.data)}
\ No newline at end of file
+    def _touch(self, base):
+        """Note a stock or price change of a base code"""
+        self.revisions[base] = self.revisions.get(base, 0) + 1
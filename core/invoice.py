@@ -0,0 +1,222 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+from config.paths import INVOICES_DIR, LOGO_IMAGE
+from config.settings import settings
+
+PAGE_SIZE = (1240, 1754)  # A4 at 150 DPI
+MARGIN = 80
+ROW_HEIGHT = 44
+ROWS_PER_PAGE = 28
+LAYOUT_COLUMNS = {
+    "Compact": ["S.No.", "Item", "Size", "Qty", "Amount"],
+    "Detailed": ["S.No.", "Item", "Size", "Rate", "Qty", "Amount"],
+    "Full": ["S.No.", "Code", "Item", "Size", "MRP", "Rate", "Qty", "Amount"]
+}
+COLUMN_WEIGHTS = {"S.No.": 1.6, "Code": 2, "Item": 5, "Size": 2, "MRP": 2, "Rate": 2, "Qty": 1.5, "Amount": 2.5}
+
+
+@lru_cache(maxsize=None)
+def _font(size, bold=False):
+    """Invoice font, loaded once per process."""
+    name = settings.INVOICE_FONT_BOLD if bold else settings.INVOICE_FONT
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+@lru_cache(maxsize=None)
+def _logo():
+    """Logo scaled for the invoice header, loaded once per process (None if missing)."""
+    try:
+        logo = Image.open(LOGO_IMAGE).convert("RGB")
+    except OSError:
+        return None
+    logo.thumbnail((220, 220))
+    return logo
+
+
+_worker_catalog = None  # Item catalog of a render_batch pool process
+
+
+def _init_worker(catalog=None):
+    """Warm the logo and font caches once per pool process."""
+    global _worker_catalog
+    _worker_catalog = catalog
+    _logo()
+    for size in (26, 30, 56):
+        _font(size)
+        _font(size, bold=True)
+
+
+def _render_job(bill, layout, fmt, out_dir):
+    """render_invoice in a pool process, with the catalog passed to the pool."""
+    return render_invoice(bill, layout, fmt, out_dir, _worker_catalog)
+
+
+def item_catalog(stock):
+    """(item name, size label) -> (code, MRP) for every item in stock."""
+    return {(item[0], f"{item[1]}GM"): (code, item[3]) for code, item in stock.items()}
+
+
+def _fill_row(item, source, columns, catalog):
+    """
+    One invoice row in the given columns.
+
+    Columns missing from the saved bill are derived: Rate from Amount/Qty,
+    Code and MRP from the catalog by item name and size.
+    """
+    row = []
+    for name in columns:
+        if name in source:
+            row.append(item[source[name]])
+        elif name == "Rate" and item[source["Qty"]]:
+            rate = item[source["Amount"]] / item[source["Qty"]]
+            row.append(int(rate) if rate == int(rate) else round(rate, 2))
+        elif name in ("Code", "MRP") and catalog:
+            known = catalog.get((item[source["Item"]], item[source["Size"]]))
+            row.append(known[0 if name == "Code" else 1] if known else "")
+        else:
+            row.append("")
+    return row
+
+
+def detect_layout(headers):
+    """Bill format a saved bill was created with."""
+    for layout, columns in LAYOUT_COLUMNS.items():
+        if headers == columns:
+            return layout
+    return settings.BILL_FORMATS[0]
+
+
+def render_invoice(bill, layout=None, fmt="pdf", out_dir=INVOICES_DIR, catalog=None):
+    """
+    Render one bill as an invoice document.
+
+    Args:
+        bill: Parsed bill (see core.archive.parse_bill)
+        layout: Compact/Detailed/Full (default: the format the bill was saved in)
+        fmt: "pdf" or "png" (PNG bills longer than a page get -2, -3... files)
+        out_dir: Output directory
+        catalog: item_catalog of the inventory, to fill Code/MRP when a
+            bill is rendered in a fuller layout than it was saved in
+
+    Returns:
+        Path: The invoice file
+    """
+    layout = layout or detect_layout(bill["headers"])
+    columns = LAYOUT_COLUMNS[layout]
+    source = {name: idx for idx, name in enumerate(bill["headers"])}
+    rows = [_fill_row(item, source, columns, catalog) for item in bill["items"]]
+
+    pages = []
+    for start in range(0, max(len(rows), 1), ROWS_PER_PAGE):
+        last = start + ROWS_PER_PAGE >= len(rows)
+        pages.append(_draw_page(bill, columns, rows[start:start + ROWS_PER_PAGE], len(pages) + 1, last))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{bill['number']}.{fmt}"
+    if fmt == "pdf":
+        pages[0].save(path, "PDF", resolution=150, save_all=True, append_images=pages[1:])
+    else:
+        pages[0].save(path, "PNG")
+        for number, page in enumerate(pages[1:], 2):
+            page.save(out_dir / f"{bill['number']}-{number}.png", "PNG")
+    return path
+
+
+def render_batch(bills, layout=None, fmt="pdf", out_dir=INVOICES_DIR, workers=None, catalog=None):
+    """
+    Render many bills on a process pool.
+
+    Args:
+        bills: Iterable of parsed bills
+        layout: Layout for all bills (default: each bill's own format)
+        fmt: "pdf" or "png"
+        out_dir: Output directory
+        workers: Pool size (default settings.INVOICE_WORKERS, or one per CPU)
+        catalog: item_catalog of the inventory (sent once per pool process)
+
+    Returns:
+        dict: count, seconds and per_second of the batch
+    """
+    # The raw sheet rows are not needed for drawing; keep pickling cheap
+    jobs = [{key: value for key, value in bill.items() if key != "rows"} for bill in bills]
+    workers = workers or settings.INVOICE_WORKERS or os.cpu_count() or 1
+    started = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog,)) as pool:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            list(pool.map(
+                _render_job, jobs,
+                [layout] * len(jobs), [fmt] * len(jobs), [out_dir] * len(jobs),
+                chunksize=chunksize
+            ))
+    seconds = time.perf_counter() - started
+    return {
+        "count": len(jobs),
+        "seconds": seconds,
+        "per_second": len(jobs) / seconds if seconds else 0
+    }
+
+
+def _draw_page(bill, columns, rows, page_number, last_page):
+    """Draw one invoice page."""
+    page = Image.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(page)
+    width = PAGE_SIZE[0] - 2 * MARGIN
+
+    # Header: logo, shop code and bill details
+    y = MARGIN
+    logo = _logo()
+    if logo:
+        page.paste(logo, (MARGIN, y))
+    draw.text((PAGE_SIZE[0] - MARGIN, y), "INVOICE", font=_font(56, bold=True), fill="black", anchor="ra")
+    details = [f"Bill No: {bill['number']}"]
+    if bill["date"]:
+        details.append(f"Date: {bill['date'].strftime('%d/%m/%Y %H:%M')}")
+    if bill["phone"]:
+        details.append(f"Phone: {bill['phone']}")
+    if page_number > 1:
+        details.append(f"Page {page_number}")
+    for idx, line in enumerate(details):
+        draw.text((PAGE_SIZE[0] - MARGIN, y + 80 + idx * 38), line, font=_font(30), fill="black", anchor="ra")
+    y += max(logo.height if logo else 0, 80 + len(details) * 38) + 40
+
+    # Item table
+    total_weight = sum(COLUMN_WEIGHTS[name] for name in columns)
+    edges = [MARGIN]
+    for name in columns:
+        edges.append(edges[-1] + width * COLUMN_WEIGHTS[name] / total_weight)
+
+    draw.rectangle([MARGIN, y, MARGIN + width, y + ROW_HEIGHT], fill="#e8e8e8")
+    _draw_row(draw, edges, y, columns, _font(26, bold=True))
+    y += ROW_HEIGHT
+    for row in rows:
+        _draw_row(draw, edges, y, row, _font(26))
+        y += ROW_HEIGHT
+        draw.line([MARGIN, y, MARGIN + width, y], fill="#cccccc")
+
+    # Totals on the last page only
+    if last_page:
+        y += 30
+        for label, value in bill["totals"]:
+            text = f"Rs. {value}" if isinstance(value, (int, float)) else str(value)
+            draw.text((edges[-2] - 20, y), f"{label}:", font=_font(30, bold=True), fill="black", anchor="ra")
+            draw.text((edges[-1] - 10, y), text, font=_font(30), fill="black", anchor="ra")
+            y += 44
+        draw.text((PAGE_SIZE[0] // 2, PAGE_SIZE[1] - MARGIN), "Thank you for your purchase!",
+                  font=_font(30), fill="black", anchor="ms")
+    return page
+
+
+def _draw_row(draw, edges, y, values, font):
+    """Draw one table row; numbers right aligned, text left aligned."""
+    for idx, value in enumerate(values):
+        if isinstance(value, (int, float)):
+            draw.text((edges[idx + 1] - 10, y + ROW_HEIGHT // 2), str(value), font=font, fill="black", anchor="rm")
+        else:
+            draw.text((edges[idx] + 10, y + ROW_HEIGHT // 2), str(value), font=font, fill="black", anchor="lm")
@@ -0,0 +1,146 @@
+import re
+from functools import reduce
+from math import ceil, gcd
+
+OBJECTIVES = ("cheapest", "fewest")
+WEIGHT_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*(KG|G|GM)?$")
+NO_PACKS = (float("inf"), float("inf"))
+
+
+def parse_weight(text):
+    """Grams in a weight like '1500', '1500g' or '1.5kg' (None if unreadable)."""
+    match = WEIGHT_PATTERN.match(str(text).upper().strip())
+    if not match:
+        return None
+    grams = float(match.group(1)) * (1000 if match.group(2) == "KG" else 1)
+    return int(round(grams)) or None
+
+
+class PackOptimizer:
+    def __init__(self, inventory):
+        """
+        Initialize the pack-size optimizer for weight-based orders.
+
+        For each base code the packs in stock are solved as a bounded
+        knapsack over weight (in steps of the gcd of the pack sizes). The
+        table is kept per base code and objective and reused for any target
+        weight until the stock or prices of that base code change.
+
+        Args:
+            inventory: InventoryManager instance
+        """
+        self.inventory = inventory
+        self._tables = {}  # (base, objective) -> table (see _build)
+
+    def packs(self, base):
+        """Packs of a base code as (code, size, price, available) tuples."""
+        packs = []
+        for code in self.inventory.bases.get(base, []):
+            item = self.inventory.stock[code]
+            if item[1] and item[1] > 0:
+                packs.append((code, int(item[1]), item[4], max(int(item[7]), 0)))
+        return packs
+
+    def solve(self, base, weight, objective="cheapest"):
+        """
+        Packs making up a target weight.
+
+        The exact weight is used when the packs in stock allow it, otherwise
+        the smallest weight above it. Among combinations of that weight the
+        objective picks the lowest price ("cheapest") or the fewest packs
+        ("fewest"), the other one breaking ties.
+
+        Args:
+            base: Base code (e.g. ALM)
+            weight: Target weight in grams
+            objective: "cheapest" or "fewest"
+
+        Returns:
+            dict: packs [(code, quantity)], weight, price and exact; None if
+            the stock of the base code cannot cover the weight
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        table = self._table(base, objective, weight)
+        if table is None:
+            return None
+
+        step, best = table["step"], table["best"]
+        target = ceil(weight / step)
+        total = next((w for w in range(target, len(best)) if best[w] != NO_PACKS), None)
+        if total is None:
+            return None
+
+        # Walk the kept items back from the chosen weight
+        quantities = {}
+        w = total
+        for idx in range(len(table["items"]) - 1, -1, -1):
+            pack, count, units = table["items"][idx]
+            if table["keep"][idx][w]:
+                code = table["packs"][pack][0]
+                quantities[code] = quantities.get(code, 0) + count
+                w -= units
+
+        prices = {pack[0]: pack[2] for pack in table["packs"]}
+        packs = sorted(quantities.items(), key=lambda pair: -self.inventory.stock[pair[0]][1])
+        return {
+            "packs": packs,
+            "weight": total * step,
+            "price": sum(prices[code] * quantity for code, quantity in packs),
+            "exact": total * step == weight
+        }
+
+    def _table(self, base, objective, weight):
+        """Cached DP table large enough for the weight (None if stock is short)."""
+        revision = self.inventory.revisions.get(base, 0)
+        table = self._tables.get((base, objective))
+        if table is None or table["revision"] != revision:
+            packs = [pack for pack in self.packs(base) if pack[3]]
+            if not packs:
+                return None
+            table = {"revision": revision, "packs": packs, "capacity": -1}
+            table["step"] = reduce(gcd, (pack[1] for pack in packs))
+            table["available"] = sum(pack[1] * pack[3] for pack in packs)
+            self._tables[(base, objective)] = table
+
+        if weight > table["available"]:
+            return None
+        step = table["step"]
+        # A smallest covering weight is below target + the largest pack
+        needed = min(ceil(weight / step) + max(pack[1] for pack in table["packs"]) // step,
+                     table["available"] // step)
+        if needed > table["capacity"]:
+            capacity = min(max(needed, 2 * table["capacity"]), table["available"] // step)
+            self._build(table, capacity, objective)
+        return table
+
+    def _build(self, table, capacity, objective):
+        """Fill the table up to capacity weight steps."""
+        # Bounded counts split into 1, 2, 4... bundles make it a 0/1 knapsack
+        items = []
+        for idx, (code, size, price, available) in enumerate(table["packs"]):
+            count = 1
+            while available > 0:
+                take = min(count, available)
+                items.append((idx, take, take * size // table["step"]))
+                available -= take
+                count *= 2
+
+        best = [NO_PACKS] * (capacity + 1)
+        best[0] = (0, 0)
+        keep = []
+        for idx, count, units in items:
+            price = table["packs"][idx][2] * count
+            cost = (price, count) if objective == "cheapest" else (count, price)
+            kept = bytearray(capacity + 1)
+            for w in range(capacity, units - 1, -1):
+                before = best[w - units]
+                if before is NO_PACKS:
+                    continue
+                candidate = (before[0] + cost[0], before[1] + cost[1])
+                if candidate < best[w]:
+                    best[w] = candidate
+                    kept[w] = 1
+            keep.append(kept)
+
+        table.update(items=items, best=best, keep=keep, capacity=capacity)
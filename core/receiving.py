@@ -0,0 +1,105 @@
+import math
+from datetime import datetime
+from core.utils import read_table
+
+RECEIVING_HEADERS = ["Date", "Supplier", "Invoice", "Item Code", "Quantity", "Unit Cost", "Amount"]
+CODE_COLUMNS = ("code", "item code", "item")
+QUANTITY_COLUMNS = ("quantity", "qty")
+COST_COLUMNS = ("unit cost", "cost", "rate", "price")
+
+
+def _pick(row, names):
+    """First non-empty value among the possible column names."""
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+class ReceivingManager:
+    def __init__(self, workbook, inventory):
+        """
+        Initialize stock receiving from purchase invoices.
+
+        Args:
+            workbook: SheetStore object
+            inventory: InventoryManager instance
+        """
+        self.workbook = workbook
+        self.inventory = inventory
+
+    @property
+    def sheet(self):
+        if "Receiving" not in self.workbook:
+            return self.workbook.create_sheet("Receiving", RECEIVING_HEADERS)
+        return self.workbook["Receiving"]
+
+    def read_invoice(self, path):
+        """
+        Read and validate a purchase invoice (CSV or xlsx).
+
+        The file needs a code column (Code/Item Code) and a quantity column
+        (Quantity/Qty); a unit cost column (Unit Cost/Cost/Rate) is optional.
+        Duplicate codes are merged into one line.
+
+        Args:
+            path: Invoice file
+
+        Returns:
+            tuple: ({code: {"quantity", "amount"}}, [error messages])
+        """
+        lines, errors = {}, []
+        for line_no, row in enumerate(read_table(path), 2):
+            code = str(_pick(row, CODE_COLUMNS) or "").upper().strip()
+            if code not in self.inventory.keys:
+                errors.append(f"Line {line_no}: invalid item code '{code}'")
+                continue
+            try:
+                quantity = float(_pick(row, QUANTITY_COLUMNS))
+                cost = float(_pick(row, COST_COLUMNS) or 0)
+            except (TypeError, ValueError):
+                errors.append(f"Line {line_no}: invalid quantity or cost for {code}")
+                continue
+            if not math.isfinite(quantity) or quantity != int(quantity) or quantity <= 0:
+                errors.append(f"Line {line_no}: quantity must be a positive whole number for {code}")
+                continue
+            if not math.isfinite(cost) or cost < 0:
+                errors.append(f"Line {line_no}: invalid cost for {code}")
+                continue
+            quantity = int(quantity)
+
+            line = lines.setdefault(code, {"quantity": 0, "amount": 0})
+            line["quantity"] += quantity
+            line["amount"] += quantity * cost
+        return lines, errors
+
+    def receive(self, lines, supplier, invoice="", date=None):
+        """
+        Add all invoice lines to stock and record the receipt, then save once.
+
+        Args:
+            lines: Validated lines from read_invoice
+            supplier: Supplier name
+            invoice: Supplier invoice number (optional)
+            date: Receiving date (default today)
+
+        Returns:
+            dict: Totals of the receipt (lines, quantity, amount)
+        """
+        if not self.inventory.add_stock_bulk({code: line["quantity"] for code, line in lines.items()}):
+            return None
+
+        date = (date or datetime.now()).strftime("%d/%m/%Y")
+        sheet = self.sheet
+        for code, line in lines.items():
+            unit_cost = round(line["amount"] / line["quantity"], 2)
+            sheet.append([date, supplier, invoice, code, line["quantity"], unit_cost, line["amount"]])
+        self.workbook.mark_dirty("Receiving")
+        self.workbook.save()
+
+        return {
+            "lines": len(lines),
+            "quantity": sum(line["quantity"] for line in lines.values()),
+            "amount": sum(line["amount"] for line in lines.values())
+        }
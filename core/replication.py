@@ -0,0 +1,204 @@
+import json
+import math
+import os
+import socket
+from config.paths import REPLICATION_DIR
+from config.settings import settings
+
+
+def check_state(state):
+    """
+    Raise ValueError unless state looks like an export_state dict:
+    {"counters": {node: {key: non-negative number}}}.
+    """
+    if not isinstance(state, dict) or not isinstance(state.get("counters"), dict):
+        raise ValueError("Not a shop state: expected an object with 'counters'")
+    for node, counters in state["counters"].items():
+        if not isinstance(counters, dict):
+            raise ValueError(f"Counters of shop {node} are not an object")
+        for key, value in counters.items():
+            number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if not number or not math.isfinite(value) or value < 0:
+                raise ValueError(f"Counter {key} of shop {node} is not a non-negative number")
+
+
+class ReplicationLog:
+    def __init__(self, node_id, log_dir=REPLICATION_DIR):
+        """
+        Initialize stock/sales replication for this shop.
+
+        Every increment made here (stock added, quantity sold, payments) is
+        appended to this node's delta log and added to its own grow-only
+        counters. Counters of other shops arrive through exported state
+        files or a socket sync and are merged by taking the per-node
+        maximum, so merging is conflict free, repeatable and order
+        independent; combined values are the sum over all nodes.
+
+        Args:
+            node_id: Short unique name of this shop (also the bill number prefix)
+            log_dir: Directory for the delta log and merged state
+        """
+        self.node_id = node_id
+        self.log_dir = log_dir
+        self.log_path = log_dir / f"{node_id}.jsonl"
+        self.state_path = log_dir / "state.json"
+        self.counters = {}  # node -> {key: value}
+        self.seq = 0  # Last own log entry folded into counters
+        self.pending = []  # (key, amount) recorded since the sheets were last saved
+        self._load()
+
+    @property
+    def is_new(self):
+        return not self.counters.get(self.node_id)
+
+    def record(self, key, amount):
+        """
+        Record a local increment.
+
+        The increment is held back until flush(), which runs once the sheets
+        are saved, so the log never counts changes the workbook has not kept
+        (e.g. a bill interrupted before payment).
+
+        Args:
+            key: Counter name (stock:<code>, sale:<code>, cash, digital,
+                cash_discount, digital_discount)
+            amount: Positive increment
+        """
+        if amount:
+            self.pending.append((key, amount))
+
+    def flush(self):
+        """Add the held-back increments to this node's counters and delta log."""
+        if not self.pending:
+            return
+        own = self.counters.setdefault(self.node_id, {})
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for key, amount in self.pending:
+                self.seq += 1
+                own[key] = own.get(key, 0) + amount
+                f.write(json.dumps({"seq": self.seq, "key": key, "amount": amount}) + "\n")
+        self.pending = []
+
+    def seed(self, inventory, accounts):
+        """Start this node's counters from the current sheet totals."""
+        for code, item in inventory.stock.items():
+            self.record(f"stock:{code}", item[5])
+            self.record(f"sale:{code}", item[6])
+        for key, value in accounts.get_sales_summary().items():
+            self.record(key.replace("_sale", ""), value)
+        self.flush()
+        self.save()
+
+    def merge(self, state):
+        """
+        Merge counters received from another node.
+
+        Args:
+            state: dict as written by export_state
+
+        Returns:
+            int: Number of counters that changed
+
+        Raises:
+            ValueError: state is not shaped like an exported state
+        """
+        check_state(state)
+        changed = 0
+        for node, counters in state["counters"].items():
+            mine = self.counters.setdefault(node, {})
+            for key, value in counters.items():
+                if value > mine.get(key, 0):
+                    mine[key] = value
+                    changed += 1
+        self.save()
+        return changed
+
+    def state(self):
+        """This node's view of every node's counters."""
+        return {"node": self.node_id, "counters": self.counters}
+
+    def export_state(self, path):
+        """Write this node's view of all counters for other shops to merge."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.state(), f)
+
+    def import_state(self, path):
+        """Merge a state file exported by another shop."""
+        with open(path, encoding="utf-8") as f:
+            return self.merge(json.load(f))
+
+    def totals(self):
+        """Combined value of every counter across all nodes."""
+        totals = {}
+        for counters in self.counters.values():
+            for key, value in counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def serve_sync(self, port=settings.REPLICATION_PORT, timeout=120, bind=settings.REPLICATION_BIND):
+        """
+        Wait for one shop to connect and exchange counters with it.
+
+        Only addresses in settings.REPLICATION_PEERS may connect when that
+        list is set; other connections are refused with ValueError.
+        """
+        with socket.create_server((bind, port)) as server:
+            server.settimeout(timeout)
+            conn, address = server.accept()
+            with conn:
+                if settings.REPLICATION_PEERS and address[0] not in settings.REPLICATION_PEERS:
+                    raise ValueError(f"Refused sync from {address[0]} (not in REPLICATION_PEERS)")
+                peer = self._exchange(conn, send_first=False)
+        return address[0], self.merge(peer)
+
+    def sync_with(self, host, port=settings.REPLICATION_PORT, timeout=30):
+        """Connect to a waiting shop and exchange counters with it."""
+        with socket.create_connection((host, port), timeout=timeout) as conn:
+            peer = self._exchange(conn, send_first=True)
+        return self.merge(peer)
+
+    def save(self):
+        """Write the merged state and drop the log entries it covers."""
+        temp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "counters": self.counters}, f)
+        os.replace(temp, self.state_path)
+        if self.log_path.exists():
+            self.log_path.unlink()
+
+    def _exchange(self, conn, send_first):
+        """Swap states as JSON lines (the connecting side sends first)."""
+        stream = conn.makefile("rwb")
+        if send_first:
+            self._send(stream)
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Peer closed the connection without sending its state")
+        if not send_first:
+            self._send(stream)
+        return json.loads(line)
+
+    def _send(self, stream):
+        stream.write(json.dumps(self.state()).encode("utf-8") + b"\n")
+        stream.flush()
+
+    def _load(self):
+        """Load merged state and replay own increments logged after it."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.counters = saved["counters"]
+            self.seq = saved["seq"]
+
+        if self.log_path.exists():
+            own = self.counters.setdefault(self.node_id, {})
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Partly written last line
+                    if entry["seq"] > self.seq:
+                        own[entry["key"]] = own.get(entry["key"], 0) + entry["amount"]
+                        self.seq = entry["seq"]
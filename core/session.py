@@ -0,0 +1,296 @@
+import builtins
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from openpyxl import load_workbook
+from config.paths import ARCHIVE_DIR, DATA_DIR, SESSIONS_DIR
+
+# Dates and times differ between a session and its replays; they are
+# masked before hashing so checksums compare stock, bills and accounts only.
+DATE_PATTERN = re.compile(r"\d{2}/\d{2}/\d{4}( \d{2}:\d{2}(:\d{2})?)?")
+COPIED_DIRS = {"data": DATA_DIR, "archive": ARCHIVE_DIR}
+
+
+def sheet_checksums(store):
+    """
+    Checksum of every saved sheet's values, with dates masked.
+
+    Args:
+        store: SheetStore (its saved files are read)
+
+    Returns:
+        dict: sheet name -> short sha256 hex digest
+    """
+    checksums = {}
+    for name in store.sheetnames:
+        digest = hashlib.sha256()
+        workbook = load_workbook(store.path(name), read_only=True)
+        try:
+            for row in workbook[name].iter_rows(values_only=True):
+                values = []
+                for value in row:
+                    if isinstance(value, datetime):
+                        value = "<date>"
+                    elif isinstance(value, str):
+                        value = DATE_PATTERN.sub("<date>", value)
+                    values.append(value)
+                digest.update(repr(values).encode("utf-8"))
+        finally:
+            workbook.close()
+        checksums[name] = digest.hexdigest()[:16]
+    return checksums
+
+
+def valid_session_name(name):
+    """True for a plain file name usable as a session name (no folders, no '..')."""
+    if not name or name in (".", "..") or "/" in name or "\\" in name:
+        return False
+    return Path(name).name == name and not Path(name).is_absolute()
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class SessionRecorder:
+    def __init__(self, name=None, sessions_dir=SESSIONS_DIR):
+        """
+        Record every answer typed in this session.
+
+        The data and archive directories are copied first, so the session
+        can later be replayed from the exact state it started in. After a
+        first entry with the start date, each input() call is logged to
+        <name>.jsonl as the prompt, the time it was asked, the time it was
+        answered (seconds from the start) and the answer.
+
+        Args:
+            name: Session name, a plain file name (default: current date and time)
+            sessions_dir: Directory for recorded sessions
+
+        Raises:
+            ValueError: The name is not a plain file name, or is taken by
+                something other than an earlier recording
+        """
+        self.name = name or datetime.now().strftime("%Y%m%d_%H%M%S")
+        if not valid_session_name(self.name):
+            raise ValueError(f"Invalid session name '{self.name}'")
+        self.path = sessions_dir / f"{self.name}.jsonl"
+        self.start_dir = sessions_dir / self.name
+        if self.start_dir.exists():
+            # Reusing a name replaces the earlier recording, start state included
+            inside = self.start_dir.resolve().parent == sessions_dir.resolve()
+            if not (inside and self.start_dir.is_dir() and self.path.is_file()):
+                raise ValueError(f"{self.start_dir} exists and is not a recorded session")
+            shutil.rmtree(self.start_dir)
+        self.start_dir.mkdir(parents=True)
+        for folder, source in COPIED_DIRS.items():
+            if source.exists():
+                shutil.copytree(source, self.start_dir / folder)
+
+        self._input = builtins.input
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._started = time.perf_counter()
+        self._write({"started": datetime.now().isoformat(timespec="seconds")})
+
+    def __call__(self, prompt=""):
+        asked = time.perf_counter() - self._started
+        value = self._input(prompt)
+        self._write({
+            "prompt": prompt,
+            "asked": round(asked, 3),
+            "t": round(time.perf_counter() - self._started, 3),
+            "value": value
+        })
+        return value
+
+    def start(self):
+        """Route input() through the recorder."""
+        builtins.input = self
+
+    def stop(self, store=None):
+        """
+        Restore input() and close the session file.
+
+        Args:
+            store: SheetStore whose saved sheets are checksummed for replays to compare
+        """
+        builtins.input = self._input
+        if store is not None:
+            self._write({"checksums": sheet_checksums(store)})
+        self._file.close()
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+
+class SessionPlayer:
+    def __init__(self, path, speed=0, menu_prompt=None):
+        """
+        Feed a recorded session back to input().
+
+        Time spent between answering one prompt and the next input() call
+        is the application's own work; it is added up per main-menu
+        operation (the answer given at menu_prompt).
+
+        Args:
+            path: Recorded session file
+            speed: Time compression; 1 keeps the recorded pauses, 10 makes
+                them ten times shorter, 0 skips them
+            menu_prompt: Main menu prompt, used to split the session into operations
+        """
+        with open(path, encoding="utf-8") as f:
+            self.entries = [entry for entry in map(json.loads, f) if "value" in entry]
+        self.speed = speed
+        self.menu_prompt = menu_prompt
+        self.position = 0
+        self.latencies = {}  # Operation -> [seconds]
+        self.mismatches = []  # (answer number, recorded prompt, asked prompt)
+        self._operation = None
+        self._busy = 0
+        self._answered = None
+
+    def __call__(self, prompt=""):
+        now = time.perf_counter()
+        if self._answered is not None:
+            self._busy += now - self._answered
+        if self.position >= len(self.entries):
+            self._close_operation()
+            raise EOFError("End of recorded session")
+
+        entry = self.entries[self.position]
+        self.position += 1
+        if entry["prompt"] != prompt:
+            self.mismatches.append((self.position, entry["prompt"].strip(), prompt.strip()))
+        if prompt == self.menu_prompt:
+            self._close_operation()
+            self._operation = entry["value"].strip()
+        if self.speed:
+            time.sleep(max(entry["t"] - entry["asked"], 0) / self.speed)
+
+        print(prompt + entry["value"])
+        self._answered = time.perf_counter()
+        return entry["value"]
+
+    def start(self):
+        """Route input() through the player."""
+        builtins.input = self
+
+    def result(self, store):
+        """Latencies, prompt mismatches and final checksums of the replay."""
+        if self._answered is not None:
+            self._busy += time.perf_counter() - self._answered
+            self._answered = None
+        self._close_operation()
+        return {
+            "answers": self.position,
+            "latencies": self.latencies,
+            "mismatches": self.mismatches,
+            "checksums": sheet_checksums(store)
+        }
+
+    def _close_operation(self):
+        if self._operation is not None:
+            self.latencies.setdefault(self._operation, []).append(self._busy)
+        self._operation = None
+        self._busy = 0
+
+
+def session_started(path):
+    """When a session was recorded (None for recordings without a start entry)."""
+    with open(path, encoding="utf-8") as f:
+        entry = json.loads(f.readline() or "{}")
+    return datetime.fromisoformat(entry["started"]) if "started" in entry else None
+
+
+def expected_checksums(path):
+    """Checksums written when the recording stopped (None if it never did)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if "checksums" in entry:
+                return entry["checksums"]
+    return None
+
+
+def replay_session(path, copies=1, speed=0, script=None):
+    """
+    Replay a recorded session headlessly, optionally several times at once.
+
+    Each replay runs in its own process on a private copy of the data the
+    session started from (INVENGO_HOME points the process at the copy and
+    INVENGO_HEADLESS skips WhatsApp), so replays never touch the live
+    files or each other. Bill archiving at startup uses the recording's
+    date, so a replay in a later month starts from the same bills.
+
+    Args:
+        path: Recorded session file
+        copies: Number of concurrent replays
+        speed: Time compression (see SessionPlayer)
+        script: Application entry point (default: main.py)
+
+    Returns:
+        dict: per-operation latency stats (count, p50, p95, max in ms),
+        checksums of every replay, the recorded checksums and failures
+    """
+    path = os.path.abspath(path)
+    start_dir = os.path.splitext(path)[0]
+    script = script or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+    def run_one(number):
+        home = tempfile.mkdtemp(prefix=f"invengo-replay-{number}-")
+        try:
+            for folder in COPIED_DIRS:
+                if os.path.isdir(os.path.join(start_dir, folder)):
+                    shutil.copytree(os.path.join(start_dir, folder), os.path.join(home, folder))
+            env = dict(os.environ, INVENGO_HOME=home, INVENGO_HEADLESS="1")
+            result_file = os.path.join(home, "replay.json")
+            with open(os.path.join(home, "output.log"), "w", encoding="utf-8") as log:
+                process = subprocess.run(
+                    [sys.executable, script, "--play", path, "--speed", str(speed), "--result", result_file],
+                    env=env, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL
+                )
+            if process.returncode or not os.path.exists(result_file):
+                return {"error": f"exit code {process.returncode}, see {home}/output.log"}
+            with open(result_file, encoding="utf-8") as f:
+                result = json.load(f)
+            shutil.rmtree(home, ignore_errors=True)
+            return result
+        except Exception as e:
+            return {"error": str(e)}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=copies) as pool:
+        results = list(pool.map(run_one, range(1, copies + 1)))
+    seconds = time.perf_counter() - started
+
+    samples = {}
+    for result in results:
+        for operation, values in result.get("latencies", {}).items():
+            samples.setdefault(operation, []).extend(values)
+    return {
+        "seconds": seconds,
+        "latencies": {
+            operation: {
+                "count": len(values),
+                "p50": _percentile(values, 0.5) * 1000,
+                "p95": _percentile(values, 0.95) * 1000,
+                "max": max(values) * 1000
+            }
+            for operation, values in samples.items()
+        },
+        "expected": expected_checksums(path),
+        "checksums": [result.get("checksums") for result in results],
+        "mismatches": [result.get("mismatches", []) for result in results],
+        "errors": [result["error"] for result in results if "error" in result]
+    }
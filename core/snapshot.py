@@ -0,0 +1,78 @@
+import hashlib
+import os
+import pickle
+from config.paths import SNAPSHOT_FILE
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SHEETS = ("Sales & Stocks", "Customer Data")  # Sheets the snapshot is built from
+
+
+def fingerprint(store, sheets=SNAPSHOT_SHEETS):
+    """Size, mtime and content hash of the files backing the given sheets."""
+    result = []
+    for name in sheets:
+        path = store.path(name)
+        stat = os.stat(path)
+        result.append((name, stat.st_size, stat.st_mtime_ns, _file_hash(path)))
+    return tuple(result)
+
+
+def save_snapshot(store, state, path=SNAPSHOT_FILE):
+    """
+    Write processed in-memory state for a fast next startup.
+
+    Call only after store.save(), so the fingerprint matches the files
+    the state was built from.
+
+    Args:
+        store: SheetStore the state belongs to
+        state: Picklable processed state (e.g. manager snapshots)
+        path: Snapshot file
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "fingerprint": fingerprint(store),
+        "state": state
+    }
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+
+
+def load_snapshot(store, path=SNAPSHOT_FILE):
+    """
+    Load the snapshot if it still matches the sheet files.
+
+    Returns:
+        The saved state, or None when there is no usable snapshot
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    # Cheap size/mtime check first, content hash only if those match
+    saved = snapshot["fingerprint"]
+    for name, size, mtime, _ in saved:
+        if name not in store:
+            return None
+        stat = os.stat(store.path(name))
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+            return None
+    if fingerprint(store, [entry[0] for entry in saved]) != saved:
+        return None
+    return snapshot["state"]
+
+
+def _file_hash(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
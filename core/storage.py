@@ -0,0 +1,240 @@
+import json
+import os
+import re
+from copy import copy
+from openpyxl import Workbook, load_workbook
+from config.paths import DATA_DIR, EXCEL_TEMPLATE
+
+
+def sheet_filename(name):
+    """File name used to store a sheet (e.g. 'Sales & Stocks' -> sales_stocks.xlsx)."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") + ".xlsx"
+
+
+def linked_groups(book):
+    """
+    Group sheets whose formulas refer to each other (e.g. Accounts summing
+    a 'Sales & Stocks' column), in workbook order.
+
+    Returns:
+        list: Lists of sheet names; unlinked sheets form groups of one
+    """
+    names = book.sheetnames
+    groups = {name: [name] for name in names}
+    for sheet in book:
+        for row in sheet.iter_rows(values_only=True):
+            for value in row:
+                if not (isinstance(value, str) and value.startswith("=") and "!" in value):
+                    continue
+                for other in names:
+                    if other == sheet.title or groups[other] is groups[sheet.title]:
+                        continue
+                    if f"'{other}'!" in value or f"{other}!" in value:
+                        merged = groups[sheet.title] + groups[other]
+                        for name in merged:
+                            groups[name] = merged
+
+    result = []
+    for name in names:
+        if groups[name][0] not in [group[0] for group in result]:
+            result.append(sorted(groups[name], key=names.index))
+    return result
+
+
+class SheetStore:
+    def __init__(self, data_dir=DATA_DIR, template=EXCEL_TEMPLATE):
+        """
+        Initialize per-sheet storage.
+
+        Every sheet of the template lives in its own workbook file inside
+        data_dir, except sheets whose formulas refer to each other: those
+        share one file so the references keep working in Excel. Files are
+        loaded on first use and only files holding a sheet marked dirty are
+        written back by save().
+
+        Args:
+            data_dir: Directory holding one .xlsx file per sheet
+            template: Combined workbook used to create the store on first run
+        """
+        self.data_dir = data_dir
+        self.manifest_path = data_dir / "sheets.json"
+        self._books = {}  # File name -> loaded workbook
+        self._dirty = set()
+        self._unsaved = set()  # Sheets created since the last save, not yet in the manifest
+        self.on_save = []  # Called after every save(), e.g. ReplicationLog.flush
+
+        if not self.manifest_path.exists():
+            self._split_template(template)
+        with open(self.manifest_path, encoding="utf-8") as f:
+            self.files = json.load(f)  # Sheet name -> file name, in sheet order
+
+    @property
+    def sheetnames(self):
+        return list(self.files)
+
+    @property
+    def dirty(self):
+        return set(self._dirty)
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def __getitem__(self, name):
+        if name not in self.files:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return self._book(name)[name]
+
+    def path(self, name):
+        """Path of the file storing a sheet."""
+        return self.data_dir / self.files[name]
+
+    def mark_dirty(self, name):
+        """Mark a sheet as changed so the next save() writes it."""
+        if name not in self.files:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        self._dirty.add(name)
+
+    def save(self):
+        """
+        Write the file of every dirty sheet.
+
+        Returns:
+            list: Names of the dirty sheets written
+        """
+        saved, written = [], set()
+        for name in self.sheetnames:
+            if name in self._dirty:
+                if self.files[name] not in written:
+                    self._write(self.files[name])
+                    written.add(self.files[name])
+                self._dirty.discard(name)
+                saved.append(name)
+        if self._unsaved:
+            # Only list new sheets once their files exist
+            self._save_manifest()
+            self._unsaved.clear()
+        for callback in self.on_save:
+            callback()
+        return saved
+
+    def create_sheet(self, name, headers=None):
+        """
+        Add a new sheet to the store.
+
+        The sheet is listed in the manifest once save() has written its file.
+
+        Args:
+            name: Sheet name
+            headers: Optional first row
+
+        Returns:
+            Worksheet: The new sheet
+        """
+        if name in self.files:
+            raise ValueError(f"Worksheet {name} already exists.")
+        book = Workbook()
+        book.active.title = name
+        if headers:
+            book.active.append(headers)
+
+        self.files[name] = sheet_filename(name)
+        self._books[self.files[name]] = book
+        self._unsaved.add(name)
+        self.mark_dirty(name)
+        return book[name]
+
+    def reset_sheet(self, name):
+        """Replace a sheet with an empty one, keeping its column widths."""
+        book = self._book(name)
+        old = book[name]
+        index = book.index(old)
+        book.remove(old)
+        sheet = book.create_sheet(name, index)
+        for key, dim in old.column_dimensions.items():
+            sheet.column_dimensions[key].width = dim.width
+
+        self.mark_dirty(name)
+        return sheet
+
+    def export(self, path=EXCEL_TEMPLATE):
+        """
+        Combine all sheets into a single workbook (e.g. template.xlsx).
+
+        Args:
+            path: Destination file
+        """
+        combined = Workbook()
+        combined.remove(combined.active)
+        for name in self.sheetnames:
+            self._copy_sheet(self[name], combined.create_sheet(name))
+        combined.save(path)
+
+    def _book(self, name):
+        """Load the workbook file of a sheet on first use."""
+        filename = self.files[name]
+        if filename not in self._books:
+            self._books[filename] = load_workbook(self.data_dir / filename)
+        return self._books[filename]
+
+    def _write(self, filename):
+        """Save one file, replacing it only once fully written."""
+        path = self.data_dir / filename
+        temp = path.with_name(path.name + ".tmp")
+        self._books[filename].save(temp)
+        os.replace(temp, path)
+
+    def _split_template(self, template):
+        """Create the store from a combined workbook."""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        source = load_workbook(template, read_only=True)
+        names = source.sheetnames
+        groups = linked_groups(source)
+        source.close()
+
+        files = {}
+        for group in groups:
+            book = load_workbook(template)
+            for other in book.sheetnames:
+                if other not in group:
+                    book.remove(book[other])
+            for name in group:
+                files[name] = sheet_filename(group[0])
+            book.save(self.data_dir / files[group[0]])
+        files = {name: files[name] for name in names}
+
+        self.files = files
+        self._save_manifest()
+
+    def _save_manifest(self):
+        """Write the sheet name -> file name mapping."""
+        temp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.files, f, indent=1)
+        os.replace(temp, self.manifest_path)
+
+    def _copy_sheet(self, source, target):
+        """Copy values, styles, comments and layout between workbooks."""
+        for row in source.iter_rows():
+            for cell in row:
+                if cell.value is None and not cell.has_style and not cell.comment:
+                    continue
+                new = target.cell(row=cell.row, column=cell.column, value=cell.value)
+                if cell.has_style:
+                    new.font = copy(cell.font)
+                    new.fill = copy(cell.fill)
+                    new.border = copy(cell.border)
+                    new.alignment = copy(cell.alignment)
+                    new.protection = copy(cell.protection)
+                    new.number_format = cell.number_format
+                if cell.comment:
+                    new.comment = copy(cell.comment)
+
+        for key, dim in source.column_dimensions.items():
+            target.column_dimensions[key].width = dim.width
+        for key, dim in source.row_dimensions.items():
+            target.row_dimensions[key].height = dim.height
+        for merged in source.merged_cells.ranges:
+            target.merge_cells(str(merged))
+        target.freeze_panes = source.freeze_panes
+        if source.auto_filter.ref:
+            target.auto_filter.ref = source.auto_filter.ref
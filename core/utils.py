@@ -1,4 +1,8 @@
+import csv
+from pathlib import Path
+from zipfile import BadZipFile
 from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 from openpyxl.comments import Comment
 from tabulate import tabulate
 import pyperclip
@@ -15,6 +19,39 @@ def format_number(number, digits):
     str_num = str(number)
     return str_num.zfill(digits)
 
+def read_table(path):
+    """
+    Read a CSV or xlsx file into a list of row dicts keyed by lowercase header
+    
+    Raises:
+        ValueError: Unsupported file type or unreadable workbook
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+    elif suffix in (".xlsx", ".xlsm"):
+        try:
+            workbook = load_workbook(path, read_only=True, data_only=True)
+        except (InvalidFileException, BadZipFile, KeyError) as e:
+            raise ValueError(f"{path.name} is not a valid xlsx file") from e
+        try:
+            rows = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported file type '{path.suffix}' (use CSV or XLSX; save .xls files as .xlsx)")
+
+    if not rows:
+        return []
+    headers = [str(h).strip().lower() if h is not None else "" for h in rows[0]]
+    return [
+        dict(zip(headers, row))
+        for row in rows[1:]
+        if any(value not in (None, "") for value in row)
+    ]
+
 def image_to_clipboard(image_path):
     """Copy image to clipboard for WhatsApp sharing"""
     image = Image.open(image_path)
@@ -1,36 +1,93 @@
+import argparse
+import json
 import sys
-from openpyxl import load_workbook
-from datetime import datetime
-from config.paths import EXCEL_TEMPLATE
+from pathlib import Path
+from tabulate import tabulate
+from collections import Counter
+from datetime import date, datetime, timedelta
+from config.paths import COMBINED_WORKBOOK, EXPORTS_DIR, INVOICES_DIR
 from config.settings import settings
 from core.inventory import InventoryManager
 from core.billing import BillingSystem
 from core.customer import CustomerManager
 from core.accounts import AccountsManager
+from core.archive import BillArchive
+from core.invoice import item_catalog, render_invoice, render_batch
+from core.export import export_in_background
+from core.analytics import CustomerAnalytics
+from core.storage import SheetStore
+from core.receiving import ReceivingManager
+from core.replication import ReplicationLog
+from core.packing import OBJECTIVES, parse_weight
+from core.utils import read_table
+from core.snapshot import load_snapshot, save_snapshot
+from core.session import SessionPlayer, SessionRecorder, replay_session, session_started, valid_session_name
+
+MENU_OPTIONS = {
+    "1": "Show Stock",
+    "2": "Billing",
+    "3": "Show Price",
+    "4": "Total Sales / Accounts",
+    "5": "Add Expenses",
+    "6": "Add New Item",
+    "7": "Add Stock",
+    "8": "Show/Send Bill",
+    "9": "Export Data",
+    "10": "Customer Insights",
+    "11": "Sync Stores",
+    "0": "Exit"
+}
+MENU_PROMPT = "\nEnter your choice (0-11): "
 
 class InvenGo:
-    def __init__(self):
-        """Initialize the InvenGo application."""
+    def __init__(self, today=None):
+        """
+        Initialize the InvenGo application.
+        
+        Args:
+            today: Date deciding which bill months are closed (default now;
+                replays pass the date their session was recorded)
+        """
         try:
-            self.workbook = load_workbook(EXCEL_TEMPLATE)
-            self.inventory = InventoryManager(self.workbook)
-            self.customers = CustomerManager(self.workbook)
-            self.accounts = AccountsManager(self.workbook)
+            self.workbook = SheetStore()
+            self.archive = BillArchive(self.workbook)
+            self._rotate_bills(today)
+            self.replication = ReplicationLog(settings.NODE_ID) if settings.NODE_ID else None
+            if self.replication:
+                self.workbook.on_save.append(self.replication.flush)
+            snapshot = load_snapshot(self.workbook) or {}
+            self.inventory = InventoryManager(self.workbook, snapshot.get("inventory"), self.replication)
+            self.customers = CustomerManager(self.workbook, snapshot.get("customers"))
+            self.analytics = CustomerAnalytics(self.customers, self.archive)
+            self.accounts = AccountsManager(self.workbook, self.replication)
+            if self.replication and self.replication.is_new:
+                self.replication.seed(self.inventory, self.accounts)
+            self.receiving = ReceivingManager(self.workbook, self.inventory)
             self.billing = BillingSystem(
                 self.workbook,
                 self.inventory,
-                self.customers
+                self.customers,
+                self.analytics,
+                self.replication
             )
             print("System initialized successfully!")
         except Exception as e:
             print(f"Error initializing application: {e}")
             sys.exit(1)
 
+    def _rotate_bills(self, today=None):
+        """Move bills of closed months out of the live workbook."""
+        archived = self.archive.rotate(today)
+        if archived:
+            self.workbook.save()
+            for month, count in archived.items():
+                print(f"Archived {count} bill(s) from {month}")
+
     def run(self):
         """Main application loop."""
         while True:
             self._display_main_menu()
-            choice = input("\nEnter your choice (1-9): ").strip()
+            choice = input(MENU_PROMPT).strip()
             
             if choice == "1":
                 self._handle_stock_view()
@@ -49,6 +106,12 @@ class InvenGo:
             elif choice == "8":
                 self._handle_bill_retrieval()
             elif choice == "9":
+                self._handle_export()
+            elif choice == "10":
+                self._handle_customer_insights()
+            elif choice == "11":
+                self._handle_store_sync()
+            elif choice == "0":
                 self._shutdown()
                 break
             else:
@@ -60,15 +123,8 @@ class InvenGo:
         print("🧾 INVENGO - INVENTORY SIMPLIFIED".center(settings.WIDTH))
         print("=" * settings.WIDTH)
         print("\nMain Menu:")
-        print("1. Show Stock")
-        print("2. Billing")
-        print("3. Show Price")
-        print("4. Total Sales / Accounts")
-        print("5. Add Expenses")
-        print("6. Add New Item")
-        print("7. Add Stock")
-        print("8. Show/Send Bill")
-        print("9. Exit")
+        for key, label in MENU_OPTIONS.items():
+            print(f"{key}. {label}")
 
     def _handle_stock_view(self):
         """Handle stock viewing options."""
@@ -109,11 +165,15 @@ class InvenGo:
         whatsapp_fmt = settings.WHATSAPP_FORMATS[int(input("Choice (1-3): ")) - 1]
         
         full_details = input("Include full item details? (y/n): ").lower() == 'y'
+        scanner = input("Use barcode scanner? (y/n): ").lower() == 'y'
         
         self.billing.set_formats(bill_fmt, whatsapp_fmt, full_details)
         
         # Create bill
-        bill_data = self.billing.make_bill(phone)
+        if scanner:
+            bill_data = self.billing.make_bill_scanner(phone)
+        else:
+            bill_data = self.billing.make_bill(phone)
         if not bill_data:
             print("No items in bill. Returning to menu.")
             return
@@ -141,14 +201,19 @@ class InvenGo:
         
         # Send WhatsApp if phone provided
         if phone and input("Send via WhatsApp? (y/n): ").lower() == 'y':
+            if settings.HEADLESS:
+                print("Headless session: WhatsApp skipped.")
+                return
             self.billing.send_whatsapp_bill(bill_data, bill_number, discount)
             print("Bill sent via WhatsApp!")
 
     def _handle_price_check(self):
         """Display price for a specific item."""
         print("\nPrice Check")
-        code = input("Enter item code: ").upper().strip()
-        if code in self.inventory.keys:
+        code = input("Enter item code (or BASE@WEIGHT, e.g. ALM@1.5KG): ").upper().strip()
+        if "@" in code:
+            self._show_pack_options(code)
+        elif code in self.inventory.keys:
             item = self.inventory.stock[code]
             print(f"\nItem: {item[0]}")
             print(f"Size: {item[1]}GM")
@@ -157,6 +222,23 @@ class InvenGo:
         else:
             print("Invalid item code!")
 
+    def _show_pack_options(self, order):
+        """Show the cheapest and the fewest-pack way to make up a weight."""
+        base, _, weight = order.partition("@")
+        grams = parse_weight(weight)
+        if base not in self.inventory.bases or not grams:
+            print("Invalid order! Use base code and weight, e.g. ALM@1.5KG")
+            return
+            
+        for objective in OBJECTIVES:
+            result = self.billing.packer.solve(base, grams, objective)
+            if not result:
+                print(f"Not enough stock of {base} for {grams}GM!")
+                return
+            packs = ", ".join(f"{self.inventory.stock[code][1]}GM x {qty}" for code, qty in result["packs"])
+            note = "" if result["exact"] else " (nearest)"
+            print(f"{objective.title()}: {packs} = {result['weight']}GM{note}, ₹{result['price']}")
+
     def _show_sales_summary(self):
         """Display sales summary from accounts."""
         summary = self.accounts.get_sales_summary()
@@ -177,50 +259,67 @@ class InvenGo:
             amount = float(input("Amount: "))
             description = input("Description: ")
             self.accounts.add_expense(amount, description)
+            self.workbook.save()
             print("Expense added successfully!")
         except ValueError:
             print("Invalid amount!")
 
     def _add_new_item(self):
         """Add new item to inventory."""
+        print("\nAdd New Item Options:")
+        print("1. Single Item")
+        print("2. Catalog File (CSV/XLSX)")
+        if input("Enter choice (1-2): ").strip() == "2":
+            self._import_catalog()
+            return
+
         print("\nAdd New Item")
         try:
-            base_code = input("Base Code (e.g., ALM): ").upper().strip()
-            category = input("Category: ").title().strip()
-            item_code = input("Item Code: ").upper().strip()
-            name = input("Item Name: ").title().strip()
-            size = int(input("Size (in GM): "))
-            mrp = float(input("MRP: "))
-            price = float(input("Selling Price: "))
-            stock = int(input("Initial Stock: "))
-            
-            # Find first empty row
-            row = 2
-            while self.inventory.sheet[f"A{row}"].value is not None:
-                row += 1
-                
-            # Add new item
-            self.inventory.sheet[f"A{row}"] = base_code
-            self.inventory.sheet[f"B{row}"] = category
-            self.inventory.sheet[f"C{row}"] = item_code
-            self.inventory.sheet[f"D{row}"] = name
-            self.inventory.sheet[f"E{row}"] = size
-            self.inventory.sheet[f"F{row}"] = "GM"
-            self.inventory.sheet[f"G{row}"] = mrp
-            self.inventory.sheet[f"H{row}"] = price
-            self.inventory.sheet[f"I{row}"] = f"={stock}"
-            self.inventory.sheet[f"J{row}"] = "=0"
-            self.inventory.sheet[f"K{row}"] = f"=I{row}-J{row}"
+            details = {
+                "base_code": input("Base Code (e.g., ALM): ").upper().strip(),
+                "category": input("Category: ").title().strip(),
+                "code": input("Item Code: ").upper().strip(),
+                "name": input("Item Name: ").title().strip(),
+                "size": int(input("Size (in GM): ")),
+                "mrp": float(input("MRP: ")),
+                "price": float(input("Selling Price: ")),
+                "stock": int(input("Initial Stock: "))
+            }
             
-            self.workbook.save(EXCEL_TEMPLATE)
-            print("Item added successfully!")
-            self.inventory = InventoryManager(self.workbook)  # Refresh inventory
+            if self.inventory.add_item(details):
+                self.workbook.save()
+                print("Item added successfully!")
         except ValueError:
             print("Invalid input! Please enter correct values.")
 
+    def _import_catalog(self):
+        """Add new items and price changes from a catalog file."""
+        path = input("Catalog file path: ").strip().strip('"')
+        try:
+            rows = read_table(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not read catalog: {e}")
+            return
+
+        added, updated, errors = self.inventory.upsert_items(rows)
+        if errors:
+            print("\nCatalog has errors, nothing was imported:")
+            for error in errors:
+                print(f"  {error}")
+            return
+
+        self.workbook.save()
+        print(f"Catalog imported: {added} new item(s), {updated} price update(s)")
+
     def _add_stock(self):
         """Add stock to existing item."""
-        print("\nAdd Stock")
+        print("\nAdd Stock Options:")
+        print("1. Single Item")
+        print("2. Purchase Invoice File (CSV/XLSX)")
+        if input("Enter choice (1-2): ").strip() == "2":
+            self._receive_invoice()
+            return
+
         code = input("Enter item code: ").upper().strip()
         if code not in self.inventory.keys:
             print("Invalid item code!")
@@ -234,17 +333,45 @@ class InvenGo:
                 
             if self.inventory.add_stock(code, quantity):
                 print("Stock updated successfully!")
-                self.workbook.save(EXCEL_TEMPLATE)
-                self.inventory = InventoryManager(self.workbook)  # Refresh inventory
+                self.workbook.save()
         except ValueError:
             print("Invalid quantity!")
 
+    def _receive_invoice(self):
+        """Receive a full supplier delivery from an invoice file."""
+        path = input("Invoice file path: ").strip().strip('"')
+        try:
+            lines, errors = self.receiving.read_invoice(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not read invoice: {e}")
+            return
+
+        if errors:
+            print("\nInvoice has errors, nothing was received:")
+            for error in errors:
+                print(f"  {error}")
+            return
+        if not lines:
+            print("No items in invoice!")
+            return
+
+        print(f"\n{len(lines)} item(s), {sum(line['quantity'] for line in lines.values())} unit(s)")
+        supplier = input("Supplier: ").strip()
+        invoice = input("Supplier invoice no. (optional): ").strip()
+        if input("Receive stock? (y/n): ").lower() != 'y':
+            return
+
+        receipt = self.receiving.receive(lines, supplier, invoice)
+        if receipt:
+            print(f"Received {receipt['quantity']} unit(s) across {receipt['lines']} item(s), cost ₹{receipt['amount']}")
+
     def _handle_bill_retrieval(self):
         """Handle bill retrieval and resending."""
         print("\nBill Options:")
         print("1. Search by Phone")
         print("2. Search by Bill Number")
-        choice = input("Select (1-2): ").strip()
+        print("3. Render Invoices (PDF/PNG)")
+        choice = input("Select (1-3): ").strip()
         
         if choice == "1":
             phone = input("Enter phone number: ").strip()
@@ -253,31 +380,315 @@ class InvenGo:
                 print("No bills found for this number!")
                 return
                 
-            print(f"\nFound {len(customer['bills']} bill(s) for this number:")
+            print(f"\nFound {len(customer['bills'])} bill(s) for this number:")
             for i, bill_num in enumerate(customer['bills'], 1):
                 print(f"{i}. {bill_num}")
                 
-            if input("View a bill? (y/n): ").lower() == 'y':
+            view = input("View a bill? (y/n/all): ").lower()
+            if view == 'y':
                 bill_choice = int(input("Enter bill number (1-{}): ".format(len(customer['bills'])))) - 1
                 self._display_bill(customer['bills'][bill_choice])
+            elif view == 'all':
+                for bill in self.archive.customer_history(customer):
+                    self._print_bill(bill)
                 
         elif choice == "2":
-            bill_num = input("Enter bill number (format {}XXXX): ".format(settings.BILL_CODE)).upper().strip()
+            bill_num = input("Enter bill number (format {}{}XXXX): ".format(settings.BILL_CODE, settings.NODE_ID)).upper().strip()
             self._display_bill(bill_num)
+        elif choice == "3":
+            self._render_invoices()
         else:
             print("Invalid choice!")
 
+    def _render_invoices(self):
+        """Render one bill or a date range of bills as PDF/PNG invoices."""
+        fmt = "png" if input("Format (1. PDF  2. PNG): ").strip() == "2" else "pdf"
+        print("Layout:")
+        for i, layout in enumerate(settings.BILL_FORMATS, 1):
+            print(f"{i}. {layout}")
+        choice = input("Choice (1-3, blank = as billed): ").strip()
+        layout = settings.BILL_FORMATS[int(choice) - 1] if choice in ("1", "2", "3") else None
+        
+        bill_num = input("Bill number (blank for a date range): ").upper().strip()
+        if bill_num:
+            bill = self.archive.find_bill(bill_num)
+            if not bill:
+                print(f"Bill {bill_num} not found!")
+                return
+            catalog = item_catalog(self.inventory.stock)
+            print(f"Invoice saved to {render_invoice(bill, layout, fmt, catalog=catalog)}")
+            return
+            
+        try:
+            start = datetime.strptime(input("From date (DD/MM/YYYY): ").strip(), "%d/%m/%Y").date()
+            end = datetime.strptime(input("To date (DD/MM/YYYY): ").strip(), "%d/%m/%Y").date()
+        except ValueError:
+            print("Invalid date!")
+            return
+        result = render_batch(self.archive.bills_between(start, end), layout, fmt,
+                              catalog=item_catalog(self.inventory.stock))
+        print(f"Rendered {result['count']} invoice(s) to {INVOICES_DIR} in {result['seconds']:.1f}s "
+              f"({result['per_second']:.1f} bills/s)")
+
     def _display_bill(self, bill_number):
-        """Display a saved bill."""
-        # Implementation would search the Bills sheet and display
-        print(f"\nDisplaying bill {bill_number}...")
-        # Actual implementation would parse the Excel sheet
+        """Display a saved bill from the live sheet or the archive."""
+        bill = self.archive.find_bill(bill_number)
+        if not bill:
+            print(f"Bill {bill_number} not found!")
+            return
+        self._print_bill(bill)
+
+    def _print_bill(self, bill):
+        """Print a parsed bill."""
+        print("\n" + "=" * settings.WIDTH)
+        print(f"BILL #{bill['number']}".center(settings.WIDTH))
+        print("=" * settings.WIDTH)
+        if bill["date"]:
+            print(f"Date: {bill['date'].strftime('%d/%m/%Y %H:%M')}")
+        if bill["phone"]:
+            print(f"Phone: {bill['phone']}")
+        print(tabulate(bill["items"], headers=bill["headers"], tablefmt="fancy_grid"))
+        for label, value in bill["totals"]:
+            print(f"{label}: {value}".rjust(settings.WIDTH - 10))
+        
+    def _handle_customer_insights(self):
+        """Customer purchase analytics from the customer index."""
+        print("\nCustomer Insights:")
+        print("1. Top Customers (last 90 days)")
+        print("2. Customers Not Seen in 60 Days")
+        print("3. What a Customer Usually Buys")
+        print("4. Customer Segments (RFM)")
+        print("5. Rebuild Customer Index")
+        choice = input("Enter choice (1-5): ").strip()
+        
+        if choice == "1":
+            top = self.analytics.top_customers(100, since=date.today() - timedelta(days=90))
+            print(tabulate(top, headers=["Phone", "Amount"], tablefmt="fancy_grid"))
+        elif choice == "2":
+            lapsed = self.analytics.lapsed(60)
+            print(tabulate(
+                [(phone, last.strftime("%d/%m/%Y")) for phone, last in lapsed],
+                headers=["Phone", "Last Purchase"], tablefmt="fancy_grid"
+            ))
+        elif choice == "3":
+            phone = input("Enter phone number: ").strip()
+            items = self.analytics.usual_items(phone, 10)
+            if not items:
+                print("No purchases found for this number!")
+                return
+            print(tabulate(items, headers=["Item", "Qty Bought"], tablefmt="fancy_grid"))
+        elif choice == "4":
+            segments = Counter(segment for *_, segment in self.analytics.rfm_segments().values())
+            print(tabulate(segments.most_common(), headers=["Segment", "Customers"], tablefmt="fancy_grid"))
+        elif choice == "5":
+            self.analytics.rebuild()
+            print(f"Customer index rebuilt ({len(self.analytics.customers)} customers)")
+        else:
+            print("Invalid choice!")
+
+    def _handle_store_sync(self):
+        """Exchange stock and sales counters with the other shops."""
+        if not self.replication:
+            print("Set NODE_ID in config/settings.py to enable multi-store sync.")
+            return
+            
+        print(f"\nSync Stores (this shop: {settings.NODE_ID})")
+        print("1. Export Changes to File")
+        print("2. Import Changes from File/Folder")
+        print("3. Sync with Shop over Network")
+        print("4. Wait for Sync from Shop")
+        print("5. Show Combined Stock & Sales")
+        print("6. Show Combined Accounts")
+        choice = input("Enter choice (1-6): ").strip()
         
+        try:
+            if choice == "1":
+                path = input("Export file (blank for default): ").strip().strip('"')
+                path = Path(path) if path else self.replication.log_dir / f"{settings.NODE_ID}_state.json"
+                self.replication.export_state(path)
+                print(f"Changes exported to {path}")
+            elif choice == "2":
+                path = Path(input("File or folder to import: ").strip().strip('"'))
+                files = sorted(path.glob("*_state.json")) if path.is_dir() else [path]
+                files = [file for file in files if file.name != f"{settings.NODE_ID}_state.json"]
+                merged = changed = 0
+                for file in files:
+                    try:
+                        changed += self.replication.import_state(file)
+                        merged += 1
+                    except ValueError as e:
+                        print(f"Skipped {file.name}: {e}")
+                print(f"Merged {merged} file(s), {changed} counter(s) updated")
+            elif choice == "3":
+                host = input("Shop address (host or IP): ").strip()
+                changed = self.replication.sync_with(host)
+                print(f"Synced with {host}, {changed} counter(s) updated")
+            elif choice == "4":
+                print(f"Waiting for a shop to connect on {settings.REPLICATION_BIND or 'all interfaces'}, "
+                      f"port {settings.REPLICATION_PORT}...")
+                host, changed = self.replication.serve_sync()
+                print(f"Synced with {host}, {changed} counter(s) updated")
+            elif choice == "5":
+                self._show_combined_stock()
+            elif choice == "6":
+                totals = self.replication.totals()
+                rows = [
+                    [node, c.get("cash", 0), c.get("digital", 0), c.get("cash_discount", 0), c.get("digital_discount", 0)]
+                    for node, c in sorted(self.replication.counters.items())
+                ]
+                rows.append(["TOTAL", totals.get("cash", 0), totals.get("digital", 0),
+                             totals.get("cash_discount", 0), totals.get("digital_discount", 0)])
+                print(tabulate(rows, headers=["Shop", "Cash", "Digital", "Cash Disc.", "Digital Disc."], tablefmt="fancy_grid"))
+            else:
+                print("Invalid choice!")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Sync failed: {e}")
+
+    def _show_combined_stock(self):
+        """Stock, sales and balance summed over all shops."""
+        nodes = sorted(self.replication.counters)
+        totals = self.replication.totals()
+        rows = []
+        for code, item in self.inventory.stock.items():
+            stock, sale = totals.get(f"stock:{code}", 0), totals.get(f"sale:{code}", 0)
+            balances = [
+                self.replication.counters[node].get(f"stock:{code}", 0)
+                - self.replication.counters[node].get(f"sale:{code}", 0)
+                for node in nodes
+            ]
+            rows.append([code, item[0], item[1], stock, sale, stock - sale] + balances)
+        headers = ["Code", "Name", "Size", "Stock", "Sale", "Balance"] + [f"Bal. {node}" for node in nodes]
+        print(tabulate(rows, headers=headers, tablefmt="fancy_grid"))
+
+    def _handle_export(self):
+        """Export reports, or all sheets as one combined workbook."""
+        print("\nExport Options:")
+        print("1. Combined Workbook (template.xlsx)")
+        print("2. Stock")
+        print("3. Bills")
+        print("4. Customers")
+        print("5. Expenses")
+        choice = input("Enter choice (1-5): ").strip()
+        
+        self.workbook.save()  # Reports read the saved sheet files
+        if choice == "1":
+            COMBINED_WORKBOOK.parent.mkdir(parents=True, exist_ok=True)
+            self.workbook.export(COMBINED_WORKBOOK)
+            print(f"Workbook exported to {COMBINED_WORKBOOK}")
+            return
+        kinds = {"2": "stock", "3": "bills", "4": "customers", "5": "expenses"}
+        if choice not in kinds:
+            print("Invalid choice!")
+            return
+        kind = kinds[choice]
+            
+        filters = {}
+        try:
+            if kind in ("bills", "expenses"):
+                for key, label in (("start", "From"), ("end", "To")):
+                    value = input(f"{label} date (DD/MM/YYYY, blank for any): ").strip()
+                    if value:
+                        filters[key] = datetime.strptime(value, "%d/%m/%Y").date()
+        except ValueError:
+            print("Invalid date!")
+            return
+        if kind in ("stock", "bills"):
+            filters["category"] = input("Category (blank for all): ").title().strip() or None
+        if kind in ("bills", "customers"):
+            filters["phone"] = input("Customer phone (blank for all): ").strip() or None
+            
+        ext = "csv" if input("Format (1. XLSX  2. CSV): ").strip() == "2" else "xlsx"
+        path = EXPORTS_DIR / f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}"
+        
+        def done(count, error):
+            if error:
+                print(f"\n[Export] {kind} export failed: {error}")
+            else:
+                print(f"\n[Export] {count} row(s) exported to {path}")
+                
+        try:
+            export_in_background(kind, path, self.workbook, self.archive, on_done=done, **filters)
+        except OSError as e:
+            print(f"Could not start export: {e}")
+            return
+        print("Export started in the background; you can continue billing.")
+
     def _shutdown(self):
         """Cleanup before exiting."""
-        self.workbook.save(EXCEL_TEMPLATE)
+        self.workbook.save()
+        save_snapshot(self.workbook, {
+            "inventory": self.inventory.snapshot(),
+            "customers": self.customers.snapshot()
+        })
+        self.analytics.save()
+        if self.replication:
+            self.replication.save()
         print("\nData saved successfully. Goodbye!")
 
+def _print_replay_report(report):
+    """Print latency and consistency results of session replays."""
+    print(f"\nReplayed {len(report['checksums'])} session(s) in {report['seconds']:.1f}s")
+    rows = [
+        [MENU_OPTIONS.get(op, op), stats["count"], f"{stats['p50']:.1f}", f"{stats['p95']:.1f}", f"{stats['max']:.1f}"]
+        for op, stats in report["latencies"].items()
+    ]
+    print(tabulate(rows, headers=["Operation", "Count", "p50 ms", "p95 ms", "Max ms"], tablefmt="fancy_grid"))
+    
+    for error in report["errors"]:
+        print(f"Replay failed: {error}")
+    for number, mismatches in enumerate(report["mismatches"], 1):
+        for answer, recorded, asked in mismatches[:5]:
+            print(f"Replay {number}, answer {answer}: recorded at '{recorded}' but asked '{asked}'")
+    
+    finished = [checksums for checksums in report["checksums"] if checksums]
+    expected = report["expected"] or (finished[0] if finished else None)
+    for name in sorted(expected or {}):
+        values = {checksums.get(name) for checksums in finished}
+        status = "OK" if values == {expected[name]} else "DIFFERS"
+        print(f"{name}: {expected[name]} {status}")
+
 if __name__ == "__main__":
-    app = InvenGo()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="InvenGo - Inventory Simplified")
+    parser.add_argument("--record", nargs="?", const="", metavar="NAME",
+                        help="record this session's inputs under sessions/")
+    parser.add_argument("--replay", metavar="FILE", help="replay a recorded session headlessly")
+    parser.add_argument("--copies", type=int, default=1, help="concurrent replays (with --replay)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="replay time compression: 1 = recorded pace, 0 = no pauses")
+    parser.add_argument("--play", help=argparse.SUPPRESS)  # One replay, run by --replay
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.record and not valid_session_name(args.record):
+        parser.error("--record NAME must be a plain file name (no folders or '..')")
+    if args.copies < 1:
+        parser.error("--copies must be at least 1")
+    if args.speed < 0:
+        parser.error("--speed must be 0 or more")
+    
+    if args.replay:
+        _print_replay_report(replay_session(args.replay, args.copies, args.speed))
+    elif args.play:
+        player = SessionPlayer(args.play, args.speed, MENU_PROMPT)
+        player.start()
+        app = InvenGo(session_started(args.play))
+        try:
+            app.run()
+        except EOFError:
+            pass  # Session ended without Exit, as it was recorded
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(player.result(app.workbook), f)
+    elif args.record is not None:
+        try:
+            recorder = SessionRecorder(args.record or None)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Recording session to {recorder.path}")
+        app = InvenGo()
+        recorder.start()
+        try:
+            app.run()
+        finally:
+            recorder.stop(app.workbook)
+    else:
+        app = InvenGo()
+        app.run()
\ No newline at end of file